@@ -0,0 +1,29 @@
+"""add token_version to users
+
+Revision ID: b7d2e91f4c3a
+Revises: 047f580a5d71
+Create Date: 2026-10-17 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e91f4c3a'
+down_revision: Union[str, Sequence[str], None] = '047f580a5d71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,37 @@
+"""add keyset pagination indexes
+
+Revision ID: c3a8f0d21e6b
+Revises: b7d2e91f4c3a
+Create Date: 2026-10-17 12:04:17.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8f0d21e6b'
+down_revision: Union[str, Sequence[str], None] = 'b7d2e91f4c3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # для users отдельный индекс не нужен: username уникален, и уникальный
+    # ix_users_username уже отдает строки в порядке (username, id)
+    # CONCURRENTLY не блокирует запись в таблицу, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_title_id', 'items', ['title', 'id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_items_title_id', table_name='items', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,45 @@
+"""add trigram search indexes
+
+Revision ID: d91e4b7a2f50
+Revises: c3a8f0d21e6b
+Create Date: 2026-10-17 13:21:08.904126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91e4b7a2f50'
+down_revision: Union[str, Sequence[str], None] = 'c3a8f0d21e6b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE EXTENSION требует прав владельца БД (или суперпользователя)
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_title_trgm', 'items', ['title'], unique=False,
+            postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_users_username_trgm', 'users', ['username'], unique=False,
+            postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_username_trgm', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_items_title_trgm', table_name='items', postgresql_concurrently=True, if_exists=True)
+    # расширение не удаляем: им могут пользоваться и другие объекты БД
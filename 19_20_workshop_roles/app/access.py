@@ -1,17 +1,68 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from uuid import UUID
 
-from app.models.users import User
+from sqlalchemy import false, true
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.scopes import CAN_BITS, scopes_from_mask
+
+_NO_BITS = (0, 0)
+_NO_ACTIONS: dict[str, tuple[int, int]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class TokenPrincipal:
+    '''
+    Пользователь, собранный только из подписанного access-токена (без БД).
+    '''
+    id: UUID
+    username: str
+    is_active: bool
+    mask: int
+
+
+@dataclass(frozen=True, slots=True)
+class UserPrincipal:
+    '''
+    Пользователь из БД в объеме, нужном для авторизации (без хэша пароля).
+    Такие объекты хранит principal_cache.
+    '''
+    id: UUID
+    username: str
+    is_active: bool
+    token_version: int
 
 
 @dataclass
 class AccessUser:
-    user: User
-    scopes: list[str]
+    user: UserPrincipal
+    # битовая маска scopes из app/core/scopes.py
+    mask: int
+    # id читаем один раз, проверки в can() обращаются к нему постоянно
+    user_id: UUID = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.user_id = self.user.id
+
+    @property
+    def scopes(self) -> frozenset[str]:
+        return scopes_from_mask(self.mask)
 
     def can(self, resource: str, action: str, owner_id: UUID | None = None) -> bool:
-        if f"{resource}:{action}:any" in self.scopes:
+        any_bit, own_bit = CAN_BITS.get(resource, _NO_ACTIONS).get(action, _NO_BITS)
+        if self.mask & any_bit:
             return True
-        if owner_id is not None and owner_id == self.user.id:
-            return f"{resource}:{action}:own" in self.scopes
-        return False
\ No newline at end of file
+        # сравнение UUID дороже битовой проверки, поэтому оно последнее
+        return bool(self.mask & own_bit) and owner_id is not None and owner_id == self.user_id
+
+    def can_where(self, resource: str, action: str, owner_column) -> ColumnElement[bool]:
+        '''
+        То же правило, что и can(), но в виде условия WHERE для массовых операций:
+        "any" - без ограничений, "own" - только свои строки, иначе - ни одной строки.
+        '''
+        any_bit, own_bit = CAN_BITS.get(resource, _NO_ACTIONS).get(action, _NO_BITS)
+        if self.mask & any_bit:
+            return true()
+        if self.mask & own_bit:
+            return owner_column == self.user_id
+        return false()
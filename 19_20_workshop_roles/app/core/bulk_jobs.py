@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.items import BulkJobStatus, ItemsBulkJob
+
+logger = logging.getLogger(__name__)
+
+# сколько хранить результат завершенной операции
+JOB_TTL_SECONDS = 24 * 60 * 60
+
+
+class BulkJobLimitError(Exception):
+    '''Слишком много фоновых операций уже выполняется, новую не запускаем.'''
+
+
+class BulkJobRegistry:
+    '''
+    Массовые операции, запущенные в фоне (?background=true).
+    Задачи живут в этом процессе: после перезапуска их статус не сохраняется.
+    Каждая операция держит соединение из пула, поэтому одновременно
+    выполняется не больше max_running операций и max_per_user на владельца.
+    '''
+
+    def __init__(self, max_running: int, max_per_user: int, maxsize: int = 1000) -> None:
+        self.max_running = max_running
+        self.max_per_user = max_per_user
+        self._jobs: TTLCache[ItemsBulkJob] = TTLCache(maxsize=maxsize, ttl=JOB_TTL_SECONDS)
+        # ссылки на задачи, чтобы их не собрал сборщик мусора
+        self._tasks: set[asyncio.Task] = set()
+        self._running_by_owner: Counter[UUID] = Counter()
+
+    def start(self, job: ItemsBulkJob, run: Callable[[ItemsBulkJob], Awaitable[None]]) -> ItemsBulkJob:
+        if len(self._tasks) >= self.max_running:
+            raise BulkJobLimitError("Too many background bulk jobs are running, try again later")
+        if self._running_by_owner[job.owner_id] >= self.max_per_user:
+            raise BulkJobLimitError("You already have a background bulk job running, wait for it to finish")
+        self._jobs.set(str(job.id), job)
+        self._running_by_owner[job.owner_id] += 1
+        task = asyncio.create_task(self._run(job, run))
+        self._tasks.add(task)
+        task.add_done_callback(lambda task: self._finished(task, job.owner_id))
+        return job
+
+    def _finished(self, task: asyncio.Task, owner_id: UUID) -> None:
+        # через done callback, а не finally в _run: задача, отмененная до
+        # первого шага, _run не выполняет, но слот освободить должна
+        self._tasks.discard(task)
+        self._running_by_owner[owner_id] -= 1
+        if self._running_by_owner[owner_id] <= 0:
+            del self._running_by_owner[owner_id]
+
+    async def _run(self, job: ItemsBulkJob, run: Callable[[ItemsBulkJob], Awaitable[None]]) -> None:
+        try:
+            await run(job)
+            job.status = BulkJobStatus.DONE
+        except asyncio.CancelledError:
+            job.status = BulkJobStatus.FAILED
+            job.error = 'cancelled'
+            raise
+        except Exception as e:
+            logger.exception("bulk job %s failed", job.id)
+            job.status = BulkJobStatus.FAILED
+            job.error = str(e)
+
+    def get(self, job_id: UUID) -> ItemsBulkJob | None:
+        return self._jobs.get(str(job_id))
+
+    async def shutdown(self) -> None:
+        '''
+        Остановить незавершенные операции: уже закоммиченные пачки остаются.
+        '''
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+bulk_jobs = BulkJobRegistry(
+    max_running=settings.ITEMS_BULK_JOBS_MAX_RUNNING,
+    max_per_user=settings.ITEMS_BULK_JOBS_MAX_PER_USER
+)
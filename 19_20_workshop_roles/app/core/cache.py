@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Generic, TypeVar
+from uuid import UUID
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.access import UserPrincipal
+    from app.models.tokens import VerifiedToken
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    '''
+    Ограниченный по размеру in-process кэш, у каждой записи свой срок жизни.
+    При переполнении вытесняется запись, к которой дольше всего не обращались (LRU).
+    '''
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # ключ -> (значение, момент истечения по time.monotonic())
+        self._data: OrderedDict[str, tuple[V, float]] = OrderedDict()
+
+    def get(self, key: str) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: V, ttl: float | None = None) -> None:
+        '''
+        Сохранить значение. ttl может быть только короче настроенного по умолчанию.
+        '''
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# проверенные access-токены по sha256 от токена (app/deps.py)
+token_cache: "TTLCache[VerifiedToken]" = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
+# пользователи, прошедшие авторизацию, по id (app/deps.py); хэш пароля не храним
+principal_cache: "TTLCache[UserPrincipal]" = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+# актуальная token_version пользователя по id (app/deps.py)
+token_versions: "TTLCache[int]" = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS
+)
+
+# версия, которой не может быть ни у одного токена (пользователь удален)
+REVOKED_TOKEN_VERSION = -1
+
+
+def remember_token_version(user_id: UUID | str, version: int) -> None:
+    token_versions.set(str(user_id), version)
+
+
+def evict_principal(user_id: UUID | str) -> None:
+    '''
+    Убрать пользователя из кэша после изменения или удаления,
+    чтобы, например, деактивация вступала в силу сразу.
+    '''
+    principal_cache.pop(str(user_id))
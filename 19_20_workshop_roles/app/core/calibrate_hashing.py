@@ -0,0 +1,102 @@
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from app.core.config import settings
+
+PASSWORD = "calibration-password-123"
+# нижняя граница памяти по рекомендациям OWASP для Argon2id (19 MiB)
+MIN_MEMORY_COST = 19 * 1024
+MAX_TIME_COST = 10
+
+
+def _hash_once(time_cost: int, memory_cost: int, parallelism: int) -> float:
+    hasher = Argon2Hasher(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism
+    )
+    started = time.perf_counter()
+    hasher.hash(PASSWORD)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(
+    pool: ProcessPoolExecutor,
+    concurrency: int,
+    rounds: int,
+    time_cost: int,
+    memory_cost: int,
+    parallelism: int
+) -> float:
+    '''
+    Медианная задержка одного хэша, когда параллельно считаются concurrency хэшей.
+    '''
+    latencies = []
+    for _ in range(rounds):
+        futures = [
+            pool.submit(_hash_once, time_cost, memory_cost, parallelism)
+            for _ in range(concurrency)
+        ]
+        latencies.extend(f.result() for f in futures)
+    return statistics.median(latencies)
+
+
+def calibrate(args) -> tuple[int, int, int, float]:
+    cores = os.cpu_count() or 1
+    # потоки Argon2 конкурируют с параллельными логинами за те же ядра
+    parallelism = max(1, min(4, cores // args.concurrency))
+    # память на хэш ограничена общим бюджетом на все одновременные хэши
+    memory_cost = max(MIN_MEMORY_COST, args.memory_budget_mb * 1024 // args.concurrency)
+
+    with ProcessPoolExecutor(max_workers=args.concurrency) as pool:
+        while True:
+            best = None
+            for time_cost in range(1, MAX_TIME_COST + 1):
+                latency = measure(pool, args.concurrency, args.rounds, time_cost, memory_cost, parallelism)
+                print(
+                    f"t={time_cost:<2} m={memory_cost:<7} p={parallelism}  "
+                    f"медиана={latency:7.1f} мс"
+                )
+                if latency > args.target_ms:
+                    break
+                best = (time_cost, memory_cost, parallelism, latency)
+            if best is not None or memory_cost <= MIN_MEMORY_COST:
+                break
+            # даже t=1 не укладывается в бюджет - уменьшаем память
+            memory_cost = max(MIN_MEMORY_COST, memory_cost // 2)
+
+    if best is None:
+        print("Цель недостижима даже на минимальных параметрах, берем минимальные.")
+        best = (1, memory_cost, parallelism, latency)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Подбор параметров Argon2 под целевую задержку хэша на этой машине"
+    )
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="допустимая задержка одного хэша, мс")
+    parser.add_argument("--concurrency", type=int, default=settings.HASH_WORKERS,
+                        help="сколько хэшей считается одновременно (обычно HASH_WORKERS)")
+    parser.add_argument("--memory-budget-mb", type=int, default=256,
+                        help="общий бюджет памяти на все одновременные хэши, МиБ")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="сколько раз повторить каждое измерение")
+    args = parser.parse_args()
+
+    time_cost, memory_cost, parallelism, latency = calibrate(args)
+    print()
+    print(f"# Argon2: ~{latency:.0f} мс на хэш при {args.concurrency} одновременных хэшах")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import literal, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+
+
+class CountStrategy(StrEnum):
+    '''
+    Как считать общее количество записей для списка:
+    - exact_window: count(*) OVER () в том же запросе, что и страница (один запрос,
+      но читает все строки под фильтром, даже если нужна страница из 10)
+    - exact_separate: отдельный SELECT count(*) с теми же фильтрами
+    - estimated: точно до COUNT_ESTIMATE_THRESHOLD, дальше - оценка планировщика
+      (для списка без фильтров - pg_class.reltuples)
+    - none: не считать вообще
+    '''
+    EXACT_WINDOW = "exact_window"
+    EXACT_SEPARATE = "exact_separate"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+class CountKind(StrEnum):
+    '''
+    Что на самом деле вернули в count.
+    '''
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+@dataclass(frozen=True, slots=True)
+class PageCount:
+    value: int | None
+    kind: CountKind
+
+    def has_more(self, offset: int, page_len: int, limit: int) -> bool:
+        '''
+        Есть ли страница после текущей. По точному count - точно,
+        иначе считаем, что есть, если страница заполнена целиком.
+        '''
+        if self.kind == CountKind.EXACT:
+            return offset + page_len < self.value
+        return page_len == limit
+
+
+NO_COUNT = PageCount(value=None, kind=CountKind.NONE)
+
+
+class _Explain(Executable, ClauseElement):
+    '''
+    EXPLAIN (FORMAT JSON) над произвольным SELECT, параметры остаются bind-параметрами.
+    '''
+    inherit_cache = False
+
+    def __init__(self, stmt) -> None:
+        self.statement = stmt
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def _planner_rows(session: AsyncSession, stmt) -> int:
+    plan = (await session.execute(_Explain(stmt))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _reltuples(session: AsyncSession, table_name: str) -> int:
+    '''
+    Оценка числа строк таблицы из статистики (-1, если ANALYZE еще не было).
+    '''
+    stmt = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)")
+    result = await session.execute(stmt, {"name": table_name})
+    value = result.scalar_one_or_none()
+    return -1 if value is None else int(value)
+
+
+async def _estimated_count(
+    session: AsyncSession,
+    model: Any,
+    apply_filters: Callable[[Any], Any],
+    seen: int
+) -> PageCount:
+    cap = settings.COUNT_ESTIMATE_THRESHOLD
+    rows_stmt = apply_filters(select(literal(1)).select_from(model))
+
+    # до порога считаем точно: сканируем не больше cap + 1 строк
+    capped_stmt = select(func.count()).select_from(rows_stmt.limit(cap + 1).subquery())
+    capped = (await session.exec(capped_stmt)).one()
+    if capped <= cap:
+        return PageCount(value=capped, kind=CountKind.EXACT)
+
+    estimate = -1
+    if rows_stmt.whereclause is None:
+        estimate = await _reltuples(session, model.__tablename__)
+    if estimate < 0:
+        estimate = await _planner_rows(session, rows_stmt)
+
+    # оценка не может быть меньше того, что мы уже точно знаем
+    return PageCount(value=max(estimate, cap + 1, seen), kind=CountKind.ESTIMATED)
+
+
+async def fetch_page_with_count(
+    session: AsyncSession,
+    model: Any,
+    apply_filters: Callable[[Any], Any],
+    order_by: tuple,
+    limit: int,
+    offset: int,
+    strategy: CountStrategy | None = None,
+    columns: tuple | None = None
+) -> tuple[list[Any], PageCount]:
+    '''
+    Страница записей model и общее количество по выбранной стратегии
+    (по умолчанию - settings.COUNT_STRATEGY).
+    apply_filters(stmt) добавляет к запросу WHERE списка.
+
+    Если переданы columns, читаются только эти колонки: вместо ORM-объектов
+    возвращаются Row (доступ по именам колонок), без identity map.
+    '''
+    strategy = CountStrategy(strategy or settings.COUNT_STRATEGY)
+    entities = columns or (model,)
+
+    if strategy == CountStrategy.EXACT_WINDOW:
+        total = func.count().over().label("total_count")
+        stmt = apply_filters(select(*entities, total))
+        stmt = stmt.order_by(*order_by).offset(offset).limit(limit)
+        rows = (await session.exec(stmt)).all()
+        if rows:
+            # лишняя колонка total_count в Row не мешает: model_construct ее пропускает
+            data = rows if columns else [row[0] for row in rows]
+            return data, PageCount(value=rows[0][-1], kind=CountKind.EXACT)
+        if offset == 0:
+            return [], PageCount(value=0, kind=CountKind.EXACT)
+        # страница за концом списка: оконная функция ничего не вернула,
+        # количество добираем отдельным запросом
+        strategy = CountStrategy.EXACT_SEPARATE
+        data = []
+    else:
+        stmt = apply_filters(select(*entities))
+        stmt = stmt.order_by(*order_by).offset(offset).limit(limit)
+        data = list((await session.exec(stmt)).all())
+
+    if strategy == CountStrategy.NONE:
+        return data, NO_COUNT
+
+    if strategy == CountStrategy.ESTIMATED:
+        seen = offset + len(data) if data else 0
+        return data, await _estimated_count(session, model, apply_filters, seen)
+
+    count_stmt = apply_filters(select(func.count()).select_from(model))
+    count = (await session.exec(count_stmt)).one()
+    return data, PageCount(value=count, kind=CountKind.EXACT)
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from enum import StrEnum
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _ndjson_chunk(columns: list[str], rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(writer, buffer: io.StringIO, rows) -> str:
+    writer.writerows(rows)
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+
+async def stream_export(stmt: Select, fmt: ExportFormat) -> AsyncIterator[bytes]:
+    '''
+    Выгрузить результат SELECT по частям через серверный курсор.
+    Сессия открывается здесь, а не берется из SessionDep: генератор
+    работает, пока отправляется ответ, уже после выхода из зависимостей.
+    '''
+    columns = [column.name for column in stmt.selected_columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == ExportFormat.CSV:
+        yield _csv_chunk(writer, buffer, [columns]).encode()
+
+    async with AsyncSessionLocal() as session:
+        # в памяти одновременно только EXPORT_CHUNK_SIZE строк
+        result = await session.stream(
+            stmt.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+        )
+        async for rows in result.partitions():
+            if fmt == ExportFormat.CSV:
+                yield _csv_chunk(writer, buffer, rows).encode()
+            else:
+                yield _ndjson_chunk(columns, rows).encode()
+
+
+def export_response(stmt: Select, fmt: ExportFormat, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(stmt, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt.value}"'}
+    )
@@ -0,0 +1,93 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core import security
+from app.core.config import settings
+
+
+class HashingOverloadedError(Exception):
+    '''Очередь на хэширование заполнена (или пул воркеров перезапускается), запрос нужно отклонить сразу.'''
+
+
+class HashingService:
+    '''
+    Хэширование и проверка паролей в отдельном пуле процессов.
+    Argon2/Bcrypt целиком занимают CPU, поэтому в async-обработчике
+    они блокировали бы event loop на все время расчета хэша.
+    Очередь ограничена: если ожидающих задач слишком много, 
+    сразу отказываем вместо того, чтобы копить задержку.
+    '''
+
+    def __init__(self, workers: int, queue_size: int, nice: int = 0) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.nice = nice
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self.restarts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # пул создаем лениво, чтобы не плодить процессы при простом импорте
+        if self._executor is None:
+            # воркеры получают пониженный приоритет, чтобы при нехватке ядер
+            # планировщик ОС отдавал процессор обработке обычных запросов
+            # (os.nice есть только на Unix, на Windows приоритет не меняем)
+            if self.nice and hasattr(os, "nice"):
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=os.nice,
+                    initargs=(self.nice,)
+                )
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _drop_executor(self, executor: ProcessPoolExecutor) -> None:
+        # пул с умершим воркером (например, убитым OOM killer) сам не восстанавливается;
+        # сбрасываем его, следующий вызов создаст новый
+        if self._executor is executor:
+            self._executor = None
+            self.restarts += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, func, *args):
+        if self._pending >= self.workers + self.queue_size:
+            raise HashingOverloadedError("Password hashing queue is full")
+        self._pending += 1
+        executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool as e:
+            self._drop_executor(executor)
+            raise HashingOverloadedError("Password hashing worker died, pool restarted") from e
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(security.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._submit(security.verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self._pending,
+            "restarts": self.restarts
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_service = HashingService(
+    workers=settings.HASH_WORKERS,
+    queue_size=settings.HASH_QUEUE_SIZE,
+    nice=settings.HASH_WORKER_NICE
+)
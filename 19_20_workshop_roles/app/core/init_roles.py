@@ -54,7 +54,8 @@ async def create_roles_and_admin():
 
         if link is None:
             session.add(UserRoleLink(user_id=admin_user.id, role_id=role_admin.id))
-            await session.commit()
+        # репозитории не коммитят (create_user только flush), транзакцию завершаем сами
+        await session.commit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+import base64
+import json
+from typing import Any
+from uuid import UUID
+
+
+def encode_cursor(*values: Any) -> str:
+    '''
+    Непрозрачный для клиента курсор: значения ключа сортировки последней строки.
+    '''
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    '''
+    Разобрать курсор, при любой ошибке - ValueError.
+    '''
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    if not all(isinstance(v, str) for v in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def decode_key_cursor(cursor: str) -> tuple[str, UUID]:
+    '''
+    Курсор вида (строковое поле сортировки, id) - для items и users.
+    '''
+    value, raw_id = decode_cursor(cursor, size=2)
+    return value, UUID(raw_id)
@@ -0,0 +1,117 @@
+import logging
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db_engine import is_instrumentation
+from app.core.request_context import route_name
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    '''
+    SQL-запросы, выполненные в рамках одного HTTP-запроса (или блока assert_max_queries).
+    Одинаковый текст SQL - один и тот же запрос с разными параметрами.
+    '''
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.statements: Counter[str] = Counter()
+
+    def add(self, statement: str) -> None:
+        self.total += 1
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        '''
+        Запросы, выполненные не меньше threshold раз - похоже на N+1.
+        '''
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_request_counter: ContextVar[QueryCounter | None] = ContextVar("request_query_counter", default=None)
+# счетчики активных assert_max_queries; не через contextvar, потому что
+# TestClient выполняет приложение в другом потоке со своим контекстом
+_captures: list[QueryCounter] = []
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    # служебные запросы (EXPLAIN журнала медленных запросов) в бюджет не входят
+    if is_instrumentation(context):
+        return
+    counter = _request_counter.get()
+    if counter is not None:
+        counter.add(statement)
+    for capture in _captures:
+        capture.add(statement)
+
+
+def install(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+
+
+def _shorten(statement: str, limit: int = 200) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def check_budget(route: str, counter: QueryCounter) -> None:
+    '''
+    Предупредить в лог, если запрос превысил бюджет или повторял один и тот же SQL.
+    '''
+    if counter.total > settings.QUERY_BUDGET_PER_REQUEST:
+        logger.warning(
+            "%s executed %d SQL statements (budget %d)",
+            route, counter.total, settings.QUERY_BUDGET_PER_REQUEST
+        )
+    for statement, count in counter.repeated(settings.QUERY_REPEAT_THRESHOLD):
+        logger.warning("%s: possible N+1, statement executed %d times: %s", route, count, _shorten(statement))
+
+
+class QueryBudgetMiddleware:
+    '''
+    Считает SQL-запросы каждого HTTP-запроса и проверяет бюджет после ответа.
+    '''
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        counter = QueryCounter()
+        token = _request_counter.set(counter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_counter.reset(token)
+            check_budget(route_name(scope), counter)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryCounter]:
+    '''
+    Для тестов: блок должен выполнить не больше limit SQL-запросов.
+
+        with assert_max_queries(3):
+            client.post(f"/users/{user_id}/items", json=..., headers=...)
+    '''
+    counter = QueryCounter()
+    _captures.append(counter)
+    try:
+        yield counter
+    finally:
+        _captures.remove(counter)
+    if counter.total > limit:
+        statements = "\n".join(
+            f"  {count} x {_shorten(statement)}" for statement, count in counter.statements.most_common()
+        )
+        raise AssertionError(f"Expected at most {limit} SQL statements, got {counter.total}:\n{statements}")
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from uuid import UUID
+
+from sqlalchemy import String, Uuid, column, update, values
+
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.users import User
+
+logger = logging.getLogger(__name__)
+
+
+class RehashQueue:
+    '''
+    Отложенное обновление хэшей паролей.
+    Когда verify_and_update возвращает новый хэш (например, после смены параметров
+    хэшера), логин не делает отдельную транзакцию, а только ставит хэш в очередь.
+    Фоновая задача пишет накопленные хэши пачкой одним UPDATE ... FROM (VALUES ...).
+    '''
+
+    def __init__(self, batch_size: int, interval: float) -> None:
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queued = 0
+        self.flushed = 0
+        self.failed = 0
+        # user_id -> (старый хэш, новый хэш); повторный логин просто перезапишет запись
+        self._pending: dict[UUID, tuple[str, str]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def enqueue(self, user_id: UUID, old_hash: str, new_hash: str) -> None:
+        self._pending[user_id] = (old_hash, new_hash)
+        self.queued += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch = []
+        for user_id in list(self._pending)[:self.batch_size]:
+            old_hash, new_hash = self._pending.pop(user_id)
+            batch.append((user_id, old_hash, new_hash))
+
+        rows = values(
+            column("id", Uuid),
+            column("old_hash", String),
+            column("new_hash", String),
+            name="v"
+        ).data(batch)
+        # условие по старому хэшу защищает от перезаписи пароля,
+        # который успели поменять, пока запись ждала в очереди
+        stmt = (
+            update(User)
+            .where(User.id == rows.c.id, User.hashed_password == rows.c.old_hash)
+            .values(hashed_password=rows.c.new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.exec(stmt)
+                await session.commit()
+        except Exception:
+            # хэш не потерян безвозвратно: при следующем логине он будет пересчитан
+            self.failed += len(batch)
+            logger.exception("Failed to flush %s password rehashes", len(batch))
+            return 0
+        self.flushed += len(batch)
+        return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while await self.flush() == self.batch_size:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending and await self.flush():
+            pass
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self.queued,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "pending": len(self._pending)
+        }
+
+
+rehash_queue = RehashQueue(
+    batch_size=settings.REHASH_BATCH_SIZE,
+    interval=settings.REHASH_FLUSH_INTERVAL_SECONDS
+)
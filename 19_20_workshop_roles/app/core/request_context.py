@@ -0,0 +1,44 @@
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# ASGI scope текущего запроса; после роутинга в нем появляется scope["route"]
+_current_scope: ContextVar[Scope | None] = ContextVar("current_scope", default=None)
+
+
+def route_name(scope: Scope) -> str:
+    '''
+    Маршрут запроса по шаблону пути, например "GET /items/{item_id}".
+    '''
+    route = scope.get("route")
+    # до роутинга (или для 404) шаблона пути еще нет, берем сам путь
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def current_route() -> str | None:
+    '''
+    Маршрут, который обрабатывает текущий запрос. None - вне запроса (фоновые задачи, скрипты).
+    '''
+    scope = _current_scope.get()
+    return None if scope is None else route_name(scope)
+
+
+class RequestContextMiddleware:
+    '''
+    Делает scope текущего запроса доступным коду без доступа к Request,
+    например обработчикам событий движка SQLAlchemy (app/core/slow_queries.py).
+    '''
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
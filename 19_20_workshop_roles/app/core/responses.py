@@ -0,0 +1,25 @@
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def page_response(
+    page_model: type[BaseModel],
+    item_model: type[BaseModel],
+    rows: Iterable[Any],
+    exclude: set[str] | None = None,
+    **meta: Any
+) -> Response:
+    '''
+    JSON-ответ списка из строк проекции (Row) без повторной валидации.
+    Строки уже прошли через схему БД, поэтому модели собираются
+    через model_construct, а готовый Response FastAPI отдает как есть,
+    не прогоняя его еще раз через response_model.
+    exclude - поля элементов, которых нет в ответе (например, description).
+    '''
+    data = [item_model.model_construct(**row._mapping) for row in rows]
+    page = page_model.model_construct(data=data, **meta)
+    content = page.model_dump_json(exclude={"data": {"__all__": exclude}} if exclude else None)
+    return Response(content=content, media_type="application/json")
@@ -0,0 +1,39 @@
+from typing import Any, TypeVar
+
+from sqlalchemy import inspect, insert, update
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+M = TypeVar("M", bound=SQLModel)
+
+
+async def insert_returning(session: AsyncSession, model: type[M], values: dict[str, Any]) -> M:
+    '''
+    INSERT ... RETURNING * одним запросом. Объект сразу попадает в identity map
+    сессии со всеми значениями из БД (включая server_default), поэтому
+    после commit не нужен refresh.
+    '''
+    stmt = insert(model).values(**values).returning(model)
+    return (await session.exec(stmt)).scalar_one()
+
+
+async def update_returning(session: AsyncSession, obj: M, values: dict[str, Any]) -> M:
+    '''
+    UPDATE ... WHERE pk RETURNING * одним запросом, obj обновляется на месте.
+    values могут содержать SQL-выражения, например Model.counter + 1.
+    '''
+    if not values:
+        return obj
+    model = type(obj)
+    mapper = inspect(model)
+    # identity берется из ключа объекта и не требует загрузки атрибутов,
+    # поэтому работает и для объекта, истекшего после rollback
+    identity = inspect(obj).identity
+    stmt = (
+        update(model)
+        .where(*(column == value for column, value in zip(mapper.primary_key, identity)))
+        .values(**values)
+        .returning(model)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    return (await session.exec(stmt)).scalar_one()
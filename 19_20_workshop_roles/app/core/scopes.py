@@ -0,0 +1,85 @@
+import hashlib
+from functools import lru_cache
+from typing import Iterable
+
+from app.core.security import ROLE_TO_SCOPES, scopes_for_roles
+
+SCOPES: dict[str, str] = {
+    "items:read:own": "Чтение только своих items",
+    "items:write:own": "Создание/изменение/удаление только своих items",
+    "items:read:any": "Чтение items у любых пользователей",
+    "items:write:any": "Создание/изменение/удаление items любых пользователей и смена владельца",
+
+    "users:read:own": "Чтение только своих данных",
+    "users:write:own": "Изменение только своих данных",
+    "users:read:any": "Чтение данных любых пользователей",
+    "users:write:any": "Создание/изменение/удаление любых пользователей"
+
+}
+
+# реестр scopes: каждому scope - свой бит, собирается один раз при импорте
+SCOPE_BITS: dict[str, int] = {}
+for _name in [*SCOPES, *sorted(set().union(*ROLE_TO_SCOPES.values()))]:
+    SCOPE_BITS.setdefault(_name, 1 << len(SCOPE_BITS))
+
+# версия реестра: маска из токена принимается, только если версия совпадает
+# (иначе после изменения SCOPES старые токены получили бы чужие биты)
+SCOPES_VERSION = hashlib.sha256(" ".join(SCOPE_BITS).encode()).hexdigest()[:8]
+
+# resource -> action -> (бит ":any", бит ":own") для AccessUser.can()
+CAN_BITS: dict[str, dict[str, tuple[int, int]]] = {}
+for _name, _bit in SCOPE_BITS.items():
+    _resource, _action, _level = _name.split(":")
+    _actions = CAN_BITS.setdefault(_resource, {})
+    _any_bit, _own_bit = _actions.get(_action, (0, 0))
+    if _level == "any":
+        _any_bit = _bit
+    elif _level == "own":
+        _own_bit = _bit
+    _actions[_action] = (_any_bit, _own_bit)
+
+
+def scope_mask(scopes: Iterable[str]) -> int:
+    '''
+    Маска для набора scopes из токена, неизвестные scopes пропускаются.
+    '''
+    mask = 0
+    for scope in scopes:
+        mask |= SCOPE_BITS.get(scope, 0)
+    return mask
+
+
+def check_scopes(scopes: Iterable[str]) -> None:
+    '''
+    Все scopes должны быть в реестре, иначе ValueError.
+    '''
+    unknown = sorted(set(scopes) - SCOPE_BITS.keys())
+    if unknown:
+        raise ValueError(f"Unknown scopes: {', '.join(unknown)}")
+
+
+@lru_cache(maxsize=None)
+def required_mask(scopes: tuple[str, ...]) -> int:
+    '''
+    Маска scopes, которые требует эндпоинт. Считается один раз на набор.
+    Scopes эндпоинтов проверяются при старте (app.deps.check_route_scopes).
+    '''
+    check_scopes(scopes)
+    mask = 0
+    for scope in scopes:
+        mask |= SCOPE_BITS[scope]
+    return mask
+
+
+def scopes_from_mask(mask: int) -> frozenset[str]:
+    return frozenset(name for name, bit in SCOPE_BITS.items() if mask & bit)
+
+
+@lru_cache(maxsize=256)
+def token_scopes_for_roles(role_names: frozenset[str]) -> tuple[str, int]:
+    '''
+    Строка scope и маска для токена. Различных наборов ролей немного,
+    поэтому результат запоминается на каждый набор.
+    '''
+    scopes = scopes_for_roles(list(role_names))
+    return " ".join(scopes), scope_mask(scopes)
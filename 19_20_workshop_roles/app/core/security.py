@@ -30,9 +30,15 @@ ROLE_TO_SCOPES: dict[str, set[str]] = {
     }
 }
 
+# при смене параметров старые хэши обновятся постепенно: verify_and_update
+# вернет новый хэш при следующем успешном логине (см. app/core/rehash.py)
 password_hash = PasswordHash(
     (
-        Argon2Hasher(),
+        Argon2Hasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM
+        ),
         BcryptHasher()
     )
 )
@@ -48,7 +54,12 @@ def scopes_for_roles(role_names: list[str]) -> list[str]:
 def create_access_token(
     subject: str | Any, 
     expires_delta: timedelta,
-    scope: str = ""
+    scope: str = "",
+    scope_mask: int | None = None,
+    scopes_version: str | None = None,
+    username: str | None = None,
+    is_active: bool | None = None,
+    token_version: int | None = None
 ) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
     payload = {
@@ -56,6 +67,15 @@ def create_access_token(
         "exp": expire,
         "scope": scope
     }
+    # рядом с читаемой строкой scope можно положить компактную маску
+    if scope_mask is not None:
+        payload["scm"] = scope_mask
+        payload["scv"] = scopes_version
+    # снимок пользователя для эндпоинтов, которым хватает данных из токена
+    if token_version is not None:
+        payload["usr"] = username
+        payload["act"] = is_active
+        payload["ver"] = token_version
     token = jwt.encode(
         payload=payload,            
         key=settings.SECRET_KEY,    
@@ -0,0 +1,163 @@
+import asyncio
+import contextvars
+import json
+import logging
+import random
+import re
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.db_engine import INSTRUMENTATION, is_instrumentation
+from app.core.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+# EXPLAIN ANALYZE выполняет запрос еще раз, поэтому берем только чтение без блокировок
+_EXPLAINABLE = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_LOCKING = re.compile(r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    route: str | None
+    statement: str
+    duration_ms: float
+    captured_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    plan: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class SlowQueryLog:
+    '''
+    Журнал медленных запросов с планами выполнения.
+    Обработчики before/after_cursor_execute замеряют каждый запрос; для SELECT
+    дольше порога с вероятностью sample_rate в фоне, на отдельном соединении,
+    выполняется EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON). Запрос, на котором
+    это случилось, план не ждет. Последние maxlen записей хранятся в памяти.
+    Параметры запросов не сохраняются, только текст.
+    '''
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        sample_rate: float,
+        maxlen: int,
+        explain_timeout_ms: int,
+        max_pending: int = 2
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain_timeout_ms = explain_timeout_ms
+        self.max_pending = max_pending
+        self.slow = 0
+        self.explained = 0
+        self.skipped = 0
+        self._entries: deque[SlowQuery] = deque(maxlen=maxlen)
+        self._tasks: set[asyncio.Task] = set()
+        self._engine: AsyncEngine | None = None
+
+    def install(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context) -> None:
+        # after_cursor_execute для упавшего запроса не вызывается
+        conn = exception_context.connection
+        started = conn.info.get("query_started_at") if conn is not None else None
+        if started:
+            started.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started_at = conn.info["query_started_at"].pop()
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        # собственные EXPLAIN журнала (и другие служебные запросы) не записываем
+        if duration_ms < self.threshold_ms or is_instrumentation(context):
+            return
+        self.slow += 1
+
+        entry = SlowQuery(route=current_route(), statement=statement, duration_ms=round(duration_ms, 2))
+        explainable = (
+            not executemany
+            and _EXPLAINABLE.match(statement)
+            and not _LOCKING.search(statement)
+            # серверный курсор еще открыт на этом соединении
+            and not context.execution_options.get("stream_results", False)
+        )
+        if not explainable or random.random() >= self.sample_rate:
+            self._entries.append(entry)
+            return
+        if len(self._tasks) >= self.max_pending:
+            self.skipped += 1
+            self._entries.append(entry)
+            return
+
+        # обработчик синхронный, но выполняется в потоке event loop (через greenlet);
+        # пустой контекст: иначе задача унаследует contextvars запроса, и ее EXPLAIN
+        # попадут в его счетчик запросов (app/core/query_budget.py)
+        task = asyncio.get_running_loop().create_task(
+            self._explain(entry, parameters),
+            context=contextvars.Context()
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, entry: SlowQuery, parameters) -> None:
+        try:
+            async with self._engine.connect() as conn:
+                conn = await conn.execution_options(**{INSTRUMENTATION: True})
+                # транзакция откатывается при выходе из блока
+                await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                result = await conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + entry.statement,
+                    tuple(parameters or ())
+                )
+                plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            entry.plan = plan[0]
+            self.explained += 1
+        except Exception as e:
+            logger.warning("EXPLAIN of slow query failed: %s", e)
+            entry.error = str(e)
+        self._entries.append(entry)
+
+    def entries(self) -> list[dict[str, Any]]:
+        # новые записи первыми
+        return [asdict(entry) for entry in reversed(self._entries)]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "sample_rate": self.sample_rate,
+            "slow": self.slow,
+            "explained": self.explained,
+            "skipped": self.skipped,
+            "pending": len(self._tasks),
+            "size": len(self._entries),
+            "maxlen": self._entries.maxlen
+        }
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    sample_rate=settings.SLOW_QUERY_SAMPLE_RATE,
+    maxlen=settings.SLOW_QUERY_LOG_SIZE,
+    explain_timeout_ms=settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS
+)
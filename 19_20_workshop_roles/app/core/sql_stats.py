@@ -0,0 +1,146 @@
+import re
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.db_engine import is_instrumentation
+from app.core.request_context import current_route
+
+# порядок важен: сначала плейсхолдеры и строки, потом числа, потом списки
+_NORMALIZE = [
+    (re.compile(r"\$\d+"), "?"),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+    # IN (?, ?, ?) и многострочный VALUES (...), (...) - один отпечаток при любой длине
+    (re.compile(r"\bIN \((?:\?(?:::\w+)?, )+\?(?:::\w+)?\)", re.IGNORECASE), "IN (...)"),
+    (re.compile(r"\bVALUES (\([^()]*\))(?:, \([^()]*\))+", re.IGNORECASE), r"VALUES \1, ..."),
+]
+
+
+def fingerprint(statement: str) -> str:
+    '''
+    Форма запроса без значений: одинаковые запросы с разными параметрами
+    и разной длиной списков IN/VALUES дают один отпечаток.
+    '''
+    for pattern, replacement in _NORMALIZE:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+class StatementStats:
+    __slots__ = ("calls", "total_ms", "max_ms", "rows", "samples", "routes")
+
+    def __init__(self, samples: int) -> None:
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        # последние длительности - для p95
+        self.samples: deque[float] = deque(maxlen=samples)
+        self.routes: Counter[str] = Counter()
+
+    def add(self, duration_ms: float, rows: int, route: str | None) -> None:
+        self.calls += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.rows += rows
+        self.samples.append(duration_ms)
+        self.routes[route or "-"] += 1
+
+    def p95(self) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class SqlStats:
+    '''
+    Накопительная статистика по формам SQL-запросов в этом процессе
+    (аналог pg_stat_statements, но с маршрутами приложения): число вызовов,
+    суммарное/среднее/p95 время, возвращенные строки.
+    Обработчики событий движка выполняются в потоке event loop, поэтому
+    таблица обновляется без блокировок.
+    '''
+
+    def __init__(self, max_statements: int, samples: int) -> None:
+        self.max_statements = max_statements
+        self.samples = samples
+        self.dropped = 0
+        self._stats: dict[str, StatementStats] = {}
+        # текст SQL -> отпечаток; SQLAlchemy кэширует компиляцию, текстов немного
+        self._fingerprints: dict[str, str] = {}
+        self._since = datetime.now(timezone.utc)
+
+    def install(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("sql_stats_started_at", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context) -> None:
+        conn = exception_context.connection
+        started = conn.info.get("sql_stats_started_at") if conn is not None else None
+        if started:
+            started.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        duration_ms = (time.perf_counter() - conn.info["sql_stats_started_at"].pop()) * 1000
+        # EXPLAIN журнала медленных запросов и другие служебные запросы не учитываем
+        if is_instrumentation(context):
+            return
+
+        key = self._fingerprints.get(statement)
+        if key is None:
+            if len(self._fingerprints) >= self.max_statements * 4:
+                self._fingerprints.clear()
+            key = self._fingerprints[statement] = fingerprint(statement)
+
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= self.max_statements:
+                self.dropped += 1
+                return
+            stats = self._stats[key] = StatementStats(self.samples)
+        # для SELECT - сколько строк вернули, для DML - сколько затронули
+        stats.add(duration_ms, max(cursor.rowcount, 0), current_route())
+
+    def report(self, limit: int, order_by: str = "total_ms") -> dict[str, Any]:
+        rows = [
+            {
+                "fingerprint": key,
+                "calls": stats.calls,
+                "total_ms": round(stats.total_ms, 2),
+                "mean_ms": round(stats.total_ms / stats.calls, 3),
+                "p95_ms": round(stats.p95(), 3),
+                "max_ms": round(stats.max_ms, 3),
+                "rows": stats.rows,
+                "routes": dict(stats.routes.most_common(5))
+            }
+            for key, stats in list(self._stats.items())
+        ]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return {
+            "since": self._since,
+            "statements": len(self._stats),
+            "dropped": self.dropped,
+            "items": rows[:limit]
+        }
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self._fingerprints.clear()
+        self.dropped = 0
+        self._since = datetime.now(timezone.utc)
+
+
+sql_stats = SqlStats(
+    max_statements=settings.SQL_STATS_MAX_STATEMENTS,
+    samples=settings.SQL_STATS_SAMPLES
+)
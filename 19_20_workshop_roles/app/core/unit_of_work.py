@@ -0,0 +1,31 @@
+from collections.abc import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# транзакцией запроса владеет get_session (app/deps.py): репозитории только
+# выполняют запросы и flush, коммит - один раз после обработчика
+
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    '''
+    Выполнить callback после коммита текущей транзакции сессии
+    (при откате - не выполнять). Для побочных эффектов вне БД, например
+    сброса кэша: до коммита другой запрос успел бы снова закэшировать
+    старые данные.
+    '''
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session: Session) -> None:
+    session.info.pop(_AFTER_COMMIT, None)
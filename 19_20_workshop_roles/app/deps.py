@@ -1,40 +1,53 @@
+import hashlib
+import time
+from collections.abc import Iterable, Iterator
 from typing import Annotated
+from uuid import UUID
 
 import jwt
 from fastapi import Depends, HTTPException
+from fastapi.dependencies.models import Dependant
+from fastapi.routing import APIRoute
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from starlette.routing import BaseRoute
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
+from app.core.cache import principal_cache, remember_token_version, token_cache, token_versions
 from app.core.config import settings
+from app.core.scopes import SCOPES, SCOPES_VERSION, check_scopes, required_mask, scope_mask
 from app.database import AsyncSessionLocal
-from app.models.tokens import TokenPayload
+from app.models.tokens import TokenPayload, VerifiedToken
 from app.models.users import User
-from app.access import AccessUser
+from app.access import AccessUser, TokenPrincipal, UserPrincipal
 
 
 async def get_session():
+    '''
+    Сессия и транзакция на время обработчика запроса (unit of work).
+    Репозитории только выполняют запросы и flush; здесь транзакция
+    коммитится один раз после обработчика или откатывается, если он
+    завершился исключением (в том числе HTTPException).
+    Соединение из пула сессия берет только при первом обращении к БД,
+    поэтому запрос, отклоненный авторизацией или обслуженный из кэша,
+    пул не трогает. scope="function" закрывает сессию (и возвращает
+    соединение в пул) сразу после обработчика, до отправки ответа.
+    '''
     async with AsyncSessionLocal() as session:
-        yield session
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        if session.in_transaction():
+            await session.commit()
 
-SessionDep = Annotated[AsyncSession, Depends(get_session)]
+SessionDep = Annotated[AsyncSession, Depends(get_session, scope="function")]
 
 
-SCOPES: dict[str, str] = {
-    "items:read:own": "Чтение только своих items",
-    "items:write:own": "Создание/изменение/удаление только своих items",
-    "items:read:any": "Чтение items у любых пользователей",
-    "items:write:any": "Создание/изменение/удаление items любых пользователей и смена владельца",
-
-    "users:read:own": "Чтение только своих данных",
-    "users:write:own": "Изменение только своих данных",
-    "users:read:any": "Чтение данных любых пользователей",
-    "users:write:any": "Создание/изменение/удаление любых пользователей"
-
-}
-
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl="/login/access-token",
     scopes=SCOPES
@@ -43,20 +56,13 @@ reusable_oauth2 = OAuth2PasswordBearer(
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-async def get_current_user(
-    session: SessionDep,
-    security_scopes: SecurityScopes,
-    token: TokenDep
-) -> AccessUser:
-    if security_scopes.scopes:
-        authenticate_value = f'Bearer scope="{security_scopes.scope_str}"'
-    else:
-        authenticate_value = f"Bearer"
-    credentials_exception = HTTPException(
-        status_code=401,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": authenticate_value}
-    )
+def verify_token(token: str) -> VerifiedToken | None:
+    # один и тот же токен приходит сотни раз до истечения, поэтому результат
+    # jwt.decode + TokenPayload кэшируем по sha256 от токена (сам токен не храним)
+    key = hashlib.sha256(token.encode()).hexdigest()
+    verified = token_cache.get(key)
+    if verified is not None:
+        return verified
 
     try:
         payload = jwt.decode(
@@ -66,22 +72,162 @@ async def get_current_user(
         )
         token_data = TokenPayload(**payload)
     except (InvalidTokenError, ValidationError):
-        raise credentials_exception
+        return None
     if not token_data.sub:
-        raise credentials_exception
-    
-    token_scopes = token_data.scope.split()
-    for scope in security_scopes.scopes:
-        if scope not in token_scopes:
-            raise HTTPException(
-                status_code=401,
-                detail="Not enough permissions",
-                headers={"WWW-Authenticate": authenticate_value}
-            )
-        
-    user = await session.get(User, token_data.sub)
+        return None
+
+    # компактная маска из токена (claim "scm") доверена, только если
+    # токен выписан для текущей версии реестра scopes
+    if token_data.scm is not None and token_data.scv == SCOPES_VERSION:
+        mask = token_data.scm
+    else:
+        mask = scope_mask(token_data.scope.split())
+    verified = VerifiedToken(
+        sub=token_data.sub,
+        mask=mask,
+        username=token_data.usr,
+        is_active=token_data.act,
+        version=token_data.ver
+    )
+    # запись не должна пережить сам токен
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    token_cache.set(key, verified, ttl=ttl)
+    return verified
+
+
+async def get_principal(session: AsyncSession, user_id: str) -> UserPrincipal | None:
+    '''
+    Пользователь для авторизации запроса. Повторные запросы в пределах
+    короткого TTL обслуживаются из кэша без обращения к таблице users
+    (а значит, и без соединения из пула).
+    '''
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    # только нужные авторизации колонки: хэш пароля не читаем и не кэшируем
+    stmt = select(User.id, User.username, User.is_active, User.token_version).where(User.id == user_id)
+    row = (await session.exec(stmt)).first()
+    if row is None:
+        return None
+    user = UserPrincipal(*row)
+    principal_cache.set(user_id, user)
+    remember_token_version(user_id, user.token_version)
+    return user
+
+
+def authorize_token(security_scopes: SecurityScopes, token: str) -> VerifiedToken:
+    '''
+    Проверка токена и scopes эндпоинта, общая для обоих способов авторизации.
+    '''
+    if security_scopes.scopes:
+        authenticate_value = f'Bearer scope="{security_scopes.scope_str}"'
+    else:
+        authenticate_value = f"Bearer"
+
+    token_data = verify_token(token)
+    if token_data is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": authenticate_value}
+        )
+
+    need = required_mask(tuple(security_scopes.scopes))
+    if token_data.mask & need != need:
+        raise HTTPException(
+            status_code=401,
+            detail="Not enough permissions",
+            headers={"WWW-Authenticate": authenticate_value}
+        )
+    return token_data
+
+
+def check_route_scopes(routes: Iterable[BaseRoute]) -> None:
+    '''
+    Проверить scopes во всех Security(..., scopes=[...]) эндпоинтов при старте
+    приложения: опечатка в scope иначе всплыла бы 500-й только на запросе.
+    '''
+    def walk(dependant: Dependant) -> Iterator[str]:
+        yield from dependant.own_oauth_scopes or ()
+        for sub_dependant in dependant.dependencies:
+            yield from walk(sub_dependant)
+
+    for route in routes:
+        if not isinstance(route, APIRoute):
+            continue
+        try:
+            check_scopes(walk(route.dependant))
+        except ValueError as e:
+            raise ValueError(f"{', '.join(sorted(route.methods))} {route.path}: {e}") from None
+
+
+def _revoked_exception() -> HTTPException:
+    return HTTPException(
+        status_code=401,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+# Как выбрать зависимость для эндпоинта:
+# - get_current_user: пользователь из БД (с коротким кэшем). Нужен, если эндпоинт
+#   работает с данными или проверяет доступ к объектам через AccessUser.can().
+# - get_token_principal: только данные из токена (id, username, is_active на момент
+#   логина) и проверка token_version. Подходит эндпоинтам, которые лишь отвечают
+#   "кто я" (GET /users/me, POST /login/test-token): в обычном случае они не
+#   открывают сессию и не обращаются к Postgres.
+# Обе зависимости используются через Security(..., scopes=[...]).
+
+async def get_current_user(
+    session: SessionDep,
+    security_scopes: SecurityScopes,
+    token: TokenDep
+) -> AccessUser:
+    token_data = authorize_token(security_scopes, token)
+
+    user = await get_principal(session, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if token_data.version is not None and token_data.version != user.token_version:
+        raise _revoked_exception()
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return AccessUser(user=user, scopes=token_scopes)
\ No newline at end of file
+    return AccessUser(user=user, mask=token_data.mask)
+
+
+async def get_token_principal(
+    security_scopes: SecurityScopes,
+    token: TokenDep
+) -> TokenPrincipal:
+    token_data = authorize_token(security_scopes, token)
+
+    current_version = token_versions.get(token_data.sub)
+    if current_version is None or token_data.version is None:
+        # версия неизвестна процессу или токен выписан без снимка -
+        # только тогда открываем сессию и читаем пользователя
+        async with AsyncSessionLocal() as session:
+            user = await get_principal(session, token_data.sub)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        if token_data.version is None:
+            if not user.is_active:
+                raise HTTPException(status_code=400, detail="Inactive user")
+            return TokenPrincipal(
+                id=user.id,
+                username=user.username,
+                is_active=user.is_active,
+                mask=token_data.mask
+            )
+        current_version = user.token_version
+
+    if token_data.version != current_version:
+        raise _revoked_exception()
+    if not token_data.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return TokenPrincipal(
+        id=UUID(token_data.sub),
+        username=token_data.username,
+        is_active=token_data.is_active,
+        mask=token_data.mask
+    )
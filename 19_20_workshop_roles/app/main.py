@@ -1,13 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from app.core.bulk_jobs import bulk_jobs
+from app.core.config import settings
+from app.core import query_budget
+from app.core.hashing import hashing_service
+from app.core.rehash import rehash_queue
+from app.core.request_context import RequestContextMiddleware
+from app.core.slow_queries import slow_query_log
+from app.core.sql_stats import sql_stats
+from app.database import engine
+from app.deps import check_route_scopes
 from app.routes.users import router as users_router
 from app.routes.utils import router as utils_router
 from app.routes.items import router as items_router
 from app.routes.login import router as login_router
 
-app = FastAPI()
 
-app.include_router(users_router)
-app.include_router(utils_router)
-app.include_router(items_router)
-app.include_router(login_router)
\ No newline at end of file
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    rehash_queue.start()
+    yield
+    await slow_query_log.shutdown()
+    await bulk_jobs.shutdown()
+    await rehash_queue.stop()
+    hashing_service.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestContextMiddleware)
+app.add_middleware(query_budget.QueryBudgetMiddleware)
+
+query_budget.install(engine)
+if settings.SQL_STATS:
+    sql_stats.install(engine)
+if settings.SLOW_QUERY_LOG:
+    slow_query_log.install(engine)
+
+for router in (users_router, utils_router, items_router, login_router):
+    check_route_scopes(router.routes)
+    app.include_router(router)
\ No newline at end of file
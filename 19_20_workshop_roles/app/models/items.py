@@ -1,8 +1,14 @@
 from uuid import UUID, uuid4
-from typing import TYPE_CHECKING
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
 
+from sqlalchemy import Index
+from pydantic import model_validator
 from sqlmodel import Field, SQLModel, Relationship
 
+from app.core.config import settings
+from app.core.counting import CountKind
+
 if TYPE_CHECKING:
     from app.models.users import User
 
@@ -23,7 +29,84 @@ class ItemOut(ItemBase):
 
 class ItemsOut(SQLModel):
     data: list[ItemOut]
-    count: int
+    # в режиме курсора (?after=...) общее количество не считается
+    count: int | None = None
+    count_kind: CountKind = CountKind.NONE
+    next_cursor: str | None = None
+
+
+class ItemsBulkCreate(SQLModel):
+    # строки проверяются по одной через ItemCreate, 
+    # чтобы ошибка в одной строке не отклоняла весь запрос
+    items: list[dict[str, Any]] = Field(min_length=1, max_length=settings.ITEMS_BULK_MAX)
+
+
+class ItemBulkResult(SQLModel):
+    index: int
+    item: ItemOut | None = None
+    errors: list[dict[str, Any]] | None = None
+
+
+class ItemsBulkOut(SQLModel):
+    created: int
+    failed: int
+    # в том же порядке, что и items в запросе
+    results: list[ItemBulkResult]
+
+
+class ItemsBulkFilter(SQLModel):
+    '''
+    Какие items менять: те же фильтры, что у списка, плюс явный список id.
+    Условия объединяются через AND, хотя бы одно обязательно.
+    '''
+    q: str | None = None
+    user_id: UUID | None = None
+    ids: list[UUID] | None = Field(default=None, min_length=1, max_length=settings.ITEMS_BULK_MAX_IDS)
+
+    @model_validator(mode='after')
+    def check_not_empty(self):
+        if not (self.q and self.q.strip()) and self.user_id is None and self.ids is None:
+            raise ValueError('At least one of q, user_id, ids is required')
+        return self
+
+
+class ItemBulkValues(SQLModel):
+    title: str | None = Field(default=None, min_length=1, max_length=128)
+    description: str | None = Field(default=None, max_length=500)
+
+
+class ItemsBulkUpdate(SQLModel):
+    filter: ItemsBulkFilter
+    values: ItemBulkValues
+
+    @model_validator(mode='after')
+    def check_values(self):
+        if not self.values.model_fields_set:
+            raise ValueError('Nothing to update')
+        return self
+
+
+class ItemsBulkDelete(SQLModel):
+    filter: ItemsBulkFilter
+
+
+class BulkJobStatus(StrEnum):
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+
+class ItemsBulkJob(SQLModel):
+    '''
+    Ход массовой операции: возвращается сразу или по GET /items/bulk-jobs/{id}.
+    '''
+    id: UUID = Field(default_factory=uuid4)
+    action: str
+    owner_id: UUID
+    status: BulkJobStatus = BulkJobStatus.RUNNING
+    affected: int = 0
+    chunks: int = 0
+    error: str | None = None
 
 
 class ItemUpdate(ItemBase):
@@ -37,6 +120,12 @@ class ItemOwnerUpdate(SQLModel):
 
 class Item(ItemBase, table=True):
     __tablename__ = 'items'
+    # под ORDER BY title, id и keyset-пагинацию по (title, id)
+    __table_args__ = (
+        Index('ix_items_title_id', 'title', 'id'),
+        # под ILIKE '%q%' в _apply_items_filters, нужен pg_trgm
+        Index('ix_items_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+    )
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(
         foreign_key='users.id', 
@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 from sqlmodel import SQLModel
 
 class Token(SQLModel):
@@ -7,3 +9,20 @@ class Token(SQLModel):
 class TokenPayload(SQLModel):
     sub: str | None = None
     scope: str = ""
+    # необязательная битовая маска scopes и версия реестра (app/core/scopes.py)
+    scm: int | None = None
+    scv: str | None = None
+    # подписанный снимок пользователя на момент логина
+    usr: str | None = None
+    act: bool | None = None
+    ver: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class VerifiedToken:
+    '''Уже проверенный access-токен: subject, битовая маска scopes и снимок пользователя.'''
+    sub: str
+    mask: int
+    username: str | None = None
+    is_active: bool | None = None
+    version: int | None = None
@@ -1,8 +1,11 @@
 from uuid import UUID, uuid4
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 
+from app.core.counting import CountKind
+
 from app.models.roles import Role, UserRoleLink
 
 if TYPE_CHECKING:
@@ -24,7 +27,10 @@ class UserOut(UserBase):
 
 class UsersOut(SQLModel):
     data: list[UserOut]
-    count: int
+    # в режиме курсора (?after=...) общее количество не считается
+    count: int | None = None
+    count_kind: CountKind = CountKind.NONE
+    next_cursor: str | None = None
 
 
 class UserUpdate(SQLModel):
@@ -34,9 +40,17 @@ class UserUpdate(SQLModel):
 
 class User(UserBase, table=True):
     __tablename__ = "users"
-    
+    # ORDER BY username, id и keyset-пагинацию по (username, id) обслуживает
+    # уникальный индекс ix_users_username: при уникальном username id порядок не меняет
+    __table_args__ = (
+        # под ILIKE '%q%' в _apply_users_filters, нужен pg_trgm
+        Index("ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     hashed_password: str 
+    # увеличивается при отзыве токенов, см. get_token_principal в app/deps.py
+    token_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     items: list["Item"] = Relationship(
         back_populates="user",
         passive_deletes="all"
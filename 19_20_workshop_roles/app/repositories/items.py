@@ -1,11 +1,19 @@
 from uuid import UUID
 
-from sqlmodel import select, func
+from sqlalchemy import Select, delete, insert, tuple_, update
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.items import Item, ItemCreate, ItemUpdate
+from app.core.filters import ilike_contains
+from app.core.returning import insert_returning, update_returning
+from app.core.counting import CountStrategy, PageCount, fetch_page_with_count
+from app.models.items import Item, ItemCreate, ItemOut, ItemUpdate
 from app.models.users import User
 
+# колонки ItemOut: списки и выгрузка читают их без загрузки Item целиком
+ITEM_OUT_COLUMNS = (Item.id, Item.title, Item.description, Item.user_id)
+
 
 def _apply_items_filters(stmt, q: str | None, user_id: UUID | None):
     if user_id is not None:
@@ -13,44 +21,167 @@ def _apply_items_filters(stmt, q: str | None, user_id: UUID | None):
     if q:
         q = q.strip()
         if q:
-            stmt = stmt.where(Item.title.ilike(f'%{q}%'))
+            stmt = stmt.where(ilike_contains(Item.title, q))
     return stmt
 
 
-async def create_item(session: AsyncSession, user: User, item_data: ItemCreate):
-    new_item = Item(**item_data.model_dump(), user=user)
-    session.add(new_item)
-    await session.commit()
-    await session.refresh(new_item)
-    return new_item
+async def create_item(session: AsyncSession, user_id: UUID, item_data: ItemCreate):
+    return await insert_returning(session, Item, {**item_data.model_dump(), 'user_id': user_id})
+
+
+async def create_items_bulk(
+    session: AsyncSession,
+    user_id: UUID,
+    items_data: list[ItemCreate]
+) -> list[ItemOut]:
+    '''
+    Вставить items одним многострочным INSERT ... RETURNING.
+    Результат в том же порядке, что и items_data.
+    '''
+    if not items_data:
+        return []
+    stmt = insert(Item).returning(
+        Item.id, Item.title, Item.description, Item.user_id,
+        sort_by_parameter_order=True
+    )
+    params = [{**item.model_dump(), 'user_id': user_id} for item in items_data]
+    result = await session.exec(stmt, params=params)
+    return [ItemOut.model_validate(row._mapping) for row in result.all()]
 
 
 async def get_item(session: AsyncSession, item_id: UUID) -> Item | None:
     return await session.get(Item, item_id)
 
 
+def item_out_columns(with_description: bool = True) -> tuple:
+    '''
+    Колонки ItemOut для чтения списков без ORM-объектов.
+    description - самая тяжелая колонка, ее можно не читать.
+    '''
+    if with_description:
+        return ITEM_OUT_COLUMNS
+    return tuple(column for column in ITEM_OUT_COLUMNS if column is not Item.description)
+
+
 async def list_items_with_count(
     session: AsyncSession,
     q: str | None,
     user_id: UUID | None,
     limit: int,
-    offset: int
-) -> tuple[list[Item], int]:
-    data_stmt = select(Item)
+    offset: int,
+    count_strategy: CountStrategy | None = None,
+    columns: tuple | None = None
+) -> tuple[list[Item], PageCount]:
+    '''
+    Страница items и count. С columns - только эти колонки (Row вместо Item).
+    '''
+    return await fetch_page_with_count(
+        session=session,
+        model=Item,
+        apply_filters=lambda stmt: _apply_items_filters(stmt=stmt, q=q, user_id=user_id),
+        order_by=(Item.title, Item.id),
+        limit=limit,
+        offset=offset,
+        strategy=count_strategy,
+        columns=columns
+    )
+
+
+async def list_items_after(
+    session: AsyncSession,
+    q: str | None,
+    user_id: UUID | None,
+    limit: int,
+    after: tuple[str, UUID] | None,
+    columns: tuple | None = None
+) -> tuple[list[Item], tuple[str, UUID] | None]:
+    '''
+    Keyset-пагинация: страница после ключа (title, id) без OFFSET и без COUNT.
+    Вернуть items и ключ для следующей страницы (None - страниц больше нет).
+    С columns - только эти колонки (Row вместо Item), title и id обязательны.
+    '''
+    data_stmt = select(*columns) if columns else select(Item)
     data_stmt = _apply_items_filters(stmt=data_stmt, q=q, user_id=user_id)
-    data_stmt = data_stmt.order_by(Item.title)
-    data_stmt = data_stmt.offset(offset).limit(limit)
+    if after is not None:
+        data_stmt = data_stmt.where(tuple_(Item.title, Item.id) > tuple_(*after))
+    # берем на одну строку больше, чтобы узнать, есть ли следующая страница
+    data_stmt = data_stmt.order_by(Item.title, Item.id).limit(limit + 1)
+
+    items = list((await session.exec(data_stmt)).all())
+    if len(items) <= limit:
+        return items, None
 
-    data_result = await session.exec(data_stmt)
-    items = data_result.all()
+    items = items[:limit]
+    last = items[-1]
+    return items, (last.title, last.id)
 
-    count_stmt = select(func.count()).select_from(Item)
-    count_stmt = _apply_items_filters(stmt=count_stmt, q=q, user_id=user_id)
 
-    count_result = await session.exec(count_stmt)
-    count = count_result.one()
+def export_items_stmt(q: str | None, user_id: UUID | None) -> Select:
+    '''
+    Запрос для потоковой выгрузки: только колонки ItemOut, без ORM-объектов.
+    Без ORDER BY, чтобы Postgres отдавал строки по мере чтения таблицы.
+    '''
+    stmt = select(*ITEM_OUT_COLUMNS)
+    return _apply_items_filters(stmt=stmt, q=q, user_id=user_id)
 
-    return items, count
+
+def bulk_items_conditions(
+    q: str | None,
+    user_id: UUID | None,
+    ids: list[UUID] | None
+) -> list[ColumnElement[bool]]:
+    stmt = _apply_items_filters(stmt=select(Item.id), q=q, user_id=user_id)
+    conditions = [stmt.whereclause] if stmt.whereclause is not None else []
+    if ids is not None:
+        conditions.append(Item.id.in_(ids))
+    return conditions
+
+
+def _chunk_ids(conditions: list[ColumnElement[bool]], after_id: UUID | None, limit: int):
+    stmt = select(Item.id).where(*conditions)
+    if after_id is not None:
+        stmt = stmt.where(Item.id > after_id)
+    return stmt.order_by(Item.id).limit(limit).scalar_subquery()
+
+
+async def update_items_chunk(
+    session: AsyncSession,
+    conditions: list[ColumnElement[bool]],
+    values: dict,
+    after_id: UUID | None,
+    limit: int
+) -> list[UUID]:
+    '''
+    Один UPDATE ... WHERE id IN (следующие limit id по порядку) RETURNING id.
+    Идем по id, поэтому строка не обновится дважды, даже если после
+    изменения снова подходит под фильтр. Коммит - на вызывающей стороне.
+    '''
+    stmt = (
+        update(Item)
+        .where(Item.id.in_(_chunk_ids(conditions, after_id, limit)))
+        .values(**values)
+        .returning(Item.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list((await session.exec(stmt)).scalars().all())
+
+
+async def delete_items_chunk(
+    session: AsyncSession,
+    conditions: list[ColumnElement[bool]],
+    after_id: UUID | None,
+    limit: int
+) -> list[UUID]:
+    '''
+    Один DELETE ... WHERE id IN (следующие limit id по порядку) RETURNING id.
+    '''
+    stmt = (
+        delete(Item)
+        .where(Item.id.in_(_chunk_ids(conditions, after_id, limit)))
+        .returning(Item.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list((await session.exec(stmt)).scalars().all())
 
 
 async def patch_item(
@@ -59,16 +190,12 @@ async def patch_item(
     item_data: ItemUpdate,
     new_user: User | None = None
 ) -> Item:
-    if new_user is not None:
-        item_db.user = new_user
     data = item_data.model_dump(exclude_unset=True, exclude={'user_id'})
-    item_db.sqlmodel_update(data)
-    session.add(item_db)
-    await session.commit()
-    await session.refresh(item_db)
-    return item_db
+    if new_user is not None:
+        data['user_id'] = new_user.id
+    return await update_returning(session, item_db, data)
 
 
 async def delete_item(session: AsyncSession, item: Item):
     await session.delete(item)
-    await session.commit()
\ No newline at end of file
+    await session.flush()
\ No newline at end of file
@@ -1,10 +1,20 @@
 from uuid import UUID
 
+from sqlalchemy import Select, tuple_
 from sqlmodel import func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.filters import ilike_contains
+from app.core.counting import CountStrategy, PageCount, fetch_page_with_count
 from app.models.users import User, UserCreate, UserUpdate
 from app.models.roles import Role, RoleName, UserRoleLink
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import REVOKED_TOKEN_VERSION, evict_principal, remember_token_version
+from app.core.hashing import hashing_service
+from app.core.returning import update_returning
+from app.core.rehash import rehash_queue
+from app.core.unit_of_work import after_commit
+
+# колонки UserOut: списки и выгрузка читают их без загрузки User целиком
+USER_OUT_COLUMNS = (User.id, User.username, User.is_active)
 
 
 def _apply_users_filters(stmt, q: str | None, is_active: bool | None):
@@ -13,20 +23,20 @@ def _apply_users_filters(stmt, q: str | None, is_active: bool | None):
     if q:
         q = q.strip()
         if q:
-            stmt = stmt.where(User.username.ilike(f'%{q}%'))
+            stmt = stmt.where(ilike_contains(User.username, q))
     return stmt
 
 
 async def create_user(session: AsyncSession, user_data: UserCreate) -> User:
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hashing_service.hash(user_data.password)
     data = user_data.model_dump(exclude={"password"})
     new_user = User(**data, hashed_password=hashed_password)
     session.add(new_user)
     stmt_role = select(Role).where(Role.name == RoleName.USER.value)
     role_user = (await session.exec(stmt_role)).first()
     session.add(UserRoleLink(user_id=new_user.id, role_id=role_user.id))
-    await session.commit()
-    await session.refresh(new_user)
+    # id и token_version заполнены на стороне Python, refresh не нужен
+    await session.flush()
     return new_user
 
 
@@ -35,22 +45,60 @@ async def list_users_with_count(
     q: str | None,              
     is_active: bool | None,     
     limit: int,                 
-    offset: int                 
-) -> tuple[list[User], int]:
-    
-    data_stmt = select(User)
+    offset: int,
+    count_strategy: CountStrategy | None = None,
+    columns: tuple | None = None
+) -> tuple[list[User], PageCount]:
+    '''
+    Страница пользователей и count. С columns - только эти колонки (Row вместо User).
+    '''
+    return await fetch_page_with_count(
+        session=session,
+        model=User,
+        apply_filters=lambda stmt: _apply_users_filters(stmt, q, is_active),
+        order_by=(User.username, User.id),
+        limit=limit,
+        offset=offset,
+        strategy=count_strategy,
+        columns=columns
+    )
+
+
+async def list_users_after(
+    session: AsyncSession,
+    q: str | None,
+    is_active: bool | None,
+    limit: int,
+    after: tuple[str, UUID] | None,
+    columns: tuple | None = None
+) -> tuple[list[User], tuple[str, UUID] | None]:
+    '''
+    Keyset-пагинация: страница после ключа (username, id) без OFFSET и без COUNT.
+    Вернуть пользователей и ключ для следующей страницы (None - страниц больше нет).
+    С columns - только эти колонки (Row вместо User), username и id обязательны.
+    '''
+    data_stmt = select(*columns) if columns else select(User)
     data_stmt = _apply_users_filters(data_stmt, q, is_active)
-    data_stmt = data_stmt.order_by(User.username)
-    data_stmt = data_stmt.offset(offset).limit(limit)
-    data_result = await session.exec(data_stmt)
-    users = data_result.all()
+    if after is not None:
+        data_stmt = data_stmt.where(tuple_(User.username, User.id) > tuple_(*after))
+    # берем на одну строку больше, чтобы узнать, есть ли следующая страница
+    data_stmt = data_stmt.order_by(User.username, User.id).limit(limit + 1)
+
+    users = list((await session.exec(data_stmt)).all())
+    if len(users) <= limit:
+        return users, None
 
-    count_stmt = select(func.count()).select_from(User)
-    count_stmt = _apply_users_filters(count_stmt, q, is_active)
-    count_result = await session.exec(count_stmt)
-    count = count_result.one()
+    users = users[:limit]
+    last = users[-1]
+    return users, (last.username, last.id)
 
-    return users, count
+
+def export_users_stmt(q: str | None, is_active: bool | None) -> Select:
+    '''
+    Запрос для потоковой выгрузки: только колонки UserOut, без ORM-объектов.
+    '''
+    stmt = select(*USER_OUT_COLUMNS)
+    return _apply_users_filters(stmt, q, is_active)
 
 
 async def get_user_by_username(session: AsyncSession, username: str) -> User | None:
@@ -59,6 +107,28 @@ async def get_user_by_username(session: AsyncSession, username: str) -> User | N
     return result.first()
 
 
+async def get_user_with_role_names(
+    session: AsyncSession,
+    username: str
+) -> tuple[User, list[str]] | None:
+    '''
+    Пользователь и имена его ролей одним запросом (LEFT JOIN + array_agg).
+    '''
+    role_names = func.array_agg(Role.name).filter(Role.name.is_not(None))
+    stmt = (
+        select(User, role_names)
+        .outerjoin(UserRoleLink, UserRoleLink.user_id == User.id)
+        .outerjoin(Role, Role.id == UserRoleLink.role_id)
+        .where(User.username == username)
+        .group_by(User.id)
+    )
+    row = (await session.exec(stmt)).first()
+    if row is None:
+        return None
+    user, names = row
+    return user, names or []
+
+
 async def get_user(session: AsyncSession, user_id: UUID) -> User | None:
     return await session.get(User, user_id)
 
@@ -68,29 +138,59 @@ async def authenticate_user(
     username: str,
     password: str
 ) -> User | None:
-    user = await get_user_by_username(session, username)
-    if user is None:
+    result = await authenticate_user_with_roles(session, username, password)
+    return result[0] if result is not None else None
+
+
+async def authenticate_user_with_roles(
+    session: AsyncSession,
+    username: str,
+    password: str
+) -> tuple[User, list[str]] | None:
+    result = await get_user_with_role_names(session, username)
+    if result is None:
         return None
-    verified, updated_hash = verify_password(password, user.hashed_password)
+    user, role_names = result
+    verified, updated_hash = await hashing_service.verify(password, user.hashed_password)
     if not verified:
         return None
     if updated_hash:
-        user.hashed_password = updated_hash
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
-    return user
+        # новый хэш пишется фоновой задачей пачкой, логин не ждет транзакцию
+        rehash_queue.enqueue(user.id, user.hashed_password, updated_hash)
+    return user, role_names
+
+
+def _forget_principal_after_commit(session: AsyncSession, user_id: UUID, token_version: int) -> None:
+    # кэш меняем только после коммита: раньше другой запрос мог бы
+    # перечитать и закэшировать еще не измененную строку
+    def forget() -> None:
+        evict_principal(user_id)
+        remember_token_version(user_id, token_version)
+
+    after_commit(session, forget)
 
 
 async def update_user(session: AsyncSession, db_user: User, user_in: UserUpdate) -> User:
     user_data = user_in.model_dump(exclude_unset=True)
-    db_user.sqlmodel_update(user_data)
-    session.add(db_user)
-    await session.commit()
-    await session.refresh(db_user)
+    # в токенах лежит снимок username и is_active (его отдают GET /users/me
+    # и /login/test-token), поэтому их смена отзывает выданные токены
+    if any(
+        field in user_data and user_data[field] != getattr(db_user, field)
+        for field in ("username", "is_active")
+    ):
+        user_data["token_version"] = User.token_version + 1
+    db_user = await update_returning(session, db_user, user_data)
+    _forget_principal_after_commit(session, db_user.id, db_user.token_version)
+    return db_user
+
+
+async def revoke_user_tokens(session: AsyncSession, db_user: User) -> User:
+    db_user = await update_returning(session, db_user, {"token_version": User.token_version + 1})
+    _forget_principal_after_commit(session, db_user.id, db_user.token_version)
     return db_user
 
 
 async def delete_user(session: AsyncSession, user: User) -> None:
     await session.delete(user)
-    await session.commit()
\ No newline at end of file
+    await session.flush()
+    _forget_principal_after_commit(session, user.id, REVOKED_TOKEN_VERSION)
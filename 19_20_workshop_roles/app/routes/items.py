@@ -1,11 +1,29 @@
 from uuid import UUID
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query, Security
+from fastapi import APIRouter, HTTPException, Query, Response, Security
 
+from app.core.bulk_jobs import BulkJobLimitError
+from app.core.counting import CountKind, CountStrategy
+from app.core.export import ExportFormat, export_response
+from app.core.pagination import decode_key_cursor, encode_cursor
+from app.core.responses import page_response
 from app.deps import SessionDep, get_current_user
-from app.models.items import ItemOut, ItemUpdate, ItemsOut, ItemOwnerUpdate, ItemCreate
+from app.models.items import (
+    ItemOut,
+    ItemUpdate,
+    ItemsOut,
+    ItemOwnerUpdate,
+    ItemCreate,
+    ItemsBulkCreate,
+    ItemsBulkOut,
+    ItemsBulkUpdate,
+    ItemsBulkDelete,
+    ItemsBulkJob,
+    BulkJobStatus
+)
 from app.services import items as items_service
+from app.repositories.items import item_out_columns
 from app.access import AccessUser
 
 router = APIRouter(prefix='/items', tags=['items'])
@@ -24,23 +42,151 @@ async def create_item(
     )
 
 
+@router.post('/bulk', response_model=ItemsBulkOut)
+async def create_items_bulk(
+    payload: ItemsBulkCreate,
+    session: SessionDep,
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:write:own"])]
+):
+    return await items_service.create_items_bulk(
+        session=session,
+        owner_id=current_user.user.id,
+        raw_items=payload.items
+    )
+
+
+async def _run_bulk(
+    session: SessionDep,
+    current_user: AccessUser,
+    payload: ItemsBulkUpdate | ItemsBulkDelete,
+    values: dict | None,
+    background: bool,
+    response: Response
+) -> ItemsBulkJob:
+    job = ItemsBulkJob(
+        action='update' if values is not None else 'delete',
+        owner_id=current_user.user_id
+    )
+    if background:
+        try:
+            job = items_service.start_items_bulk_job(
+                current_user=current_user,
+                criteria=payload.filter,
+                job=job,
+                values=values
+            )
+        except BulkJobLimitError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        response.status_code = 202
+        return job
+    job = await items_service.run_items_bulk(
+        session=session,
+        current_user=current_user,
+        criteria=payload.filter,
+        job=job,
+        values=values
+    )
+    job.status = BulkJobStatus.DONE
+    return job
+
+
+@router.post('/bulk-update', response_model=ItemsBulkJob)
+async def bulk_update_items(
+    payload: ItemsBulkUpdate,
+    session: SessionDep,
+    response: Response,
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:write:own"])],
+    background: bool = Query(default=False, description='Выполнить в фоне и сразу вернуть id операции')
+):
+    values = payload.values.model_dump(exclude_unset=True)
+    return await _run_bulk(session, current_user, payload, values, background, response)
+
+
+@router.post('/bulk-delete', response_model=ItemsBulkJob)
+async def bulk_delete_items(
+    payload: ItemsBulkDelete,
+    session: SessionDep,
+    response: Response,
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:write:own"])],
+    background: bool = Query(default=False, description='Выполнить в фоне и сразу вернуть id операции')
+):
+    return await _run_bulk(session, current_user, payload, None, background, response)
+
+
+@router.get('/bulk-jobs/{job_id}', response_model=ItemsBulkJob)
+async def read_bulk_job(
+    job_id: UUID,
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:write:own"])]
+):
+    job = items_service.get_items_bulk_job(current_user=current_user, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return job
+
+
 @router.get('/', response_model=ItemsOut)
 async def read_items(
     session: SessionDep,
     current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:read:own"])],
     q: str | None = Query(default=None, description='Поиск по названию'),
     limit: int = Query(default=20, ge=1, le=100, description='Количество записей на странице'),
-    offset: int = Query(default=0, ge=0, description='Сколько записей пропустить')
+    offset: int = Query(default=0, ge=0, description='Сколько записей пропустить'),
+    after: str | None = Query(default=None, description='Курсор следующей страницы (next_cursor), offset при этом не используется'),
+    count: CountStrategy | None = Query(default=None, description='Как считать count (по умолчанию - из настроек)'),
+    with_description: bool = Query(default=True, description='Включать description (false - колонка не читается из БД)')
 ):
-    items, count = await items_service.get_items_with_count(
+    # список читается проекцией: только колонки ItemOut, без ORM-объектов
+    columns = item_out_columns(with_description)
+    exclude = None if with_description else {'description'}
+
+    if after is not None:
+        try:
+            key = decode_key_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        rows, next_key = await items_service.get_items_page_after(
+            session=session,
+            current_user=current_user,
+            q=q,
+            limit=limit,
+            after=key,
+            columns=columns
+        )
+        next_cursor = encode_cursor(*next_key) if next_key is not None else None
+        return page_response(
+            ItemsOut, ItemOut, rows, exclude,
+            count_kind=CountKind.NONE, next_cursor=next_cursor
+        )
+
+    rows, count = await items_service.get_items_with_count(
         session=session,
         current_user=current_user,
         q=q,
         limit=limit,
-        offset=offset
+        offset=offset,
+        count_strategy=count,
+        columns=columns
+    )
+
+    # курсор на продолжение, чтобы с любой offset-страницы можно было перейти на keyset
+    next_cursor = None
+    if rows and count.has_more(offset, len(rows), limit):
+        next_cursor = encode_cursor(rows[-1].title, rows[-1].id)
+    return page_response(
+        ItemsOut, ItemOut, rows, exclude,
+        count=count.value, count_kind=count.kind, next_cursor=next_cursor
     )
 
-    return ItemsOut(data=items, count=count)
+
+# объявлен раньше /{item_id}, иначе "export" разбирался бы как item_id
+@router.get('/export')
+async def export_items(
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:read:own"])],
+    q: str | None = Query(default=None, description='Поиск по названию'),
+    format: ExportFormat = Query(default=ExportFormat.NDJSON, description='Формат выгрузки')
+):
+    stmt = items_service.get_items_export_stmt(current_user=current_user, q=q)
+    return export_response(stmt, format, filename='items')
 
 
 @router.get("/{item_id}", response_model=ItemOut) 
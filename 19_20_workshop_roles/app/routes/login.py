@@ -3,16 +3,17 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Security
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import select
 
+from app.core.cache import remember_token_version
 from app.core.config import settings
-from app.core.security import create_access_token, scopes_for_roles
-from app.deps import get_current_user, SessionDep
+from app.core.hashing import HashingOverloadedError
+from app.core.scopes import SCOPES_VERSION, token_scopes_for_roles
+from app.core.security import create_access_token
+from app.deps import get_token_principal, SessionDep
 from app.models.tokens import Token
 from app.models.users import UserOut
-from app.models.roles import Role, UserRoleLink
-from app.repositories.users import authenticate_user
-from app.access import AccessUser
+from app.repositories.users import authenticate_user_with_roles
+from app.access import TokenPrincipal
 
 router = APIRouter(prefix="/login", tags=["login"])
 
@@ -22,37 +23,54 @@ async def login_access_token(
     session: SessionDep,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ) -> Token:
-    user = await authenticate_user(session, form_data.username, form_data.password)
-    if not user:
+    try:
+        result = await authenticate_user_with_roles(
+            session,
+            form_data.username,
+            form_data.password
+        )
+    except HashingOverloadedError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many login attempts in progress, try again later",
+            headers={"Retry-After": "1"}
+        )
+    if not result:
         raise HTTPException(
             status_code=400,
             detail="Incorrect username or password"
         )
-    elif not user.is_active:
+    user, role_names = result
+    if not user.is_active:
         raise HTTPException(
             status_code=400,
             detail="Inactive user"
         )
-    stmt_roles = (
-        select(Role.name)
-        .join(UserRoleLink, Role.id == UserRoleLink.role_id)
-        .where(UserRoleLink.user_id == user.id)
-    )
-    role_names = (await session.exec(stmt_roles)).all()
-    scopes_list = scopes_for_roles(role_names)
-    scope_str = " ".join(scopes_list)
+    scope_str, mask = token_scopes_for_roles(frozenset(role_names))
+    # версия только что прочитана из БД, get_token_principal сможет обойтись без нее
+    remember_token_version(user.id, user.token_version)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return Token(
         access_token=create_access_token(
             subject=user.id, 
             expires_delta=access_token_expires,
-            scope=scope_str
+            scope=scope_str,
+            scope_mask=mask,
+            scopes_version=SCOPES_VERSION,
+            username=user.username,
+            is_active=user.is_active,
+            token_version=user.token_version
         )
     )
 
 
+# достаточно данных из токена, поэтому get_token_principal, а не get_current_user
 @router.post("/test-token", response_model=UserOut)
 async def test_token(
-    current_user: Annotated[AccessUser, Security(get_current_user, scopes=[])]
+    current_user: Annotated[TokenPrincipal, Security(get_token_principal, scopes=[])]
 ):
-    return current_user.user
\ No newline at end of file
+    return UserOut(
+        id=current_user.id,
+        username=current_user.username,
+        is_active=current_user.is_active
+    )
\ No newline at end of file
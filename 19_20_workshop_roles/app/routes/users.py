@@ -3,26 +3,47 @@ from typing import Annotated
 
 from fastapi import HTTPException, APIRouter, Query, Security
 
-from app.deps import SessionDep, get_current_user
+from app.core.hashing import HashingOverloadedError
+from app.core.counting import CountKind, CountStrategy
+from app.core.export import ExportFormat, export_response
+from app.core.pagination import decode_key_cursor, encode_cursor
+from app.core.responses import page_response
+from app.deps import SessionDep, get_current_user, get_token_principal
 from app.models.users import UserCreate, UserOut, UsersOut, UserUpdate, User
 from app.repositories.users import (
     get_user, 
     create_user as create_user_repository, 
     delete_user,
     list_users_with_count,
+    list_users_after,
+    export_users_stmt,
+    USER_OUT_COLUMNS,
     get_user_by_username,
-    update_user
+    update_user,
+    revoke_user_tokens
 )
-from app.models.items import ItemCreate, ItemsOut
-from app.repositories.items import create_item as create_item_repository, list_items_with_count
-from app.access import AccessUser
+from app.models.items import ItemCreate, ItemOut, ItemsOut, ItemsBulkCreate, ItemsBulkOut
+from app.repositories.items import (
+    create_item as create_item_repository,
+    item_out_columns,
+    list_items_with_count
+)
+from app.access import AccessUser, TokenPrincipal
+from app.services import items as items_service
 from app.services import users as users_service
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("/", response_model=UserOut)
 async def create_user(user: UserCreate, session: SessionDep):
-    return await create_user_repository(session, user)
+    try:
+        return await create_user_repository(session, user)
+    except HashingOverloadedError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many registrations in progress, try again later",
+            headers={"Retry-After": "1"}
+        )
 
 
 @router.post("/{user_id}/items")
@@ -35,10 +56,27 @@ async def create_user_item(
     user = await get_user(session, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail='User not found')
-    new_item = await create_item_repository(session=session, user=user, item_data=item_data)
+    new_item = await create_item_repository(session=session, user_id=user.id, item_data=item_data)
     return new_item
 
 
+@router.post("/{user_id}/items/bulk", response_model=ItemsBulkOut)
+async def create_user_items_bulk(
+    user_id: UUID,
+    payload: ItemsBulkCreate,
+    session: SessionDep,
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:write:any"])]
+):
+    user = await get_user(session, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail='User not found')
+    return await items_service.create_items_bulk(
+        session=session,
+        owner_id=user.id,
+        raw_items=payload.items
+    )
+
+
 @router.get("/", response_model=UsersOut)
 async def read_users(
     session: SessionDep,
@@ -46,15 +84,47 @@ async def read_users(
     q: str | None = Query(default=None, description="Поиск по username"),
     is_active: bool | None = Query(default=None, description="Фильтр активности"),
     limit: int = Query(default=20, ge=1, le=100, description="Количество записей на странице"),
-    offset: int = Query(default=0, ge=0, description="Сколько записей пропустить")
+    offset: int = Query(default=0, ge=0, description="Сколько записей пропустить"),
+    after: str | None = Query(default=None, description="Курсор следующей страницы (next_cursor), offset при этом не используется"),
+    count: CountStrategy | None = Query(default=None, description="Как считать count (по умолчанию - из настроек)")
+):
+    if after is not None:
+        try:
+            key = decode_key_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # список читается проекцией: только колонки UserOut, без ORM-объектов
+        rows, next_key = await list_users_after(session, q, is_active, limit, key, columns=USER_OUT_COLUMNS)
+        next_cursor = encode_cursor(*next_key) if next_key is not None else None
+        return page_response(UsersOut, UserOut, rows, count_kind=CountKind.NONE, next_cursor=next_cursor)
+
+    rows, count = await list_users_with_count(
+        session, q, is_active, limit, offset, count_strategy=count, columns=USER_OUT_COLUMNS
+    )
+    # курсор на продолжение, чтобы с любой offset-страницы можно было перейти на keyset
+    next_cursor = None
+    if rows and count.has_more(offset, len(rows), limit):
+        next_cursor = encode_cursor(rows[-1].username, rows[-1].id)
+    return page_response(
+        UsersOut, UserOut, rows,
+        count=count.value, count_kind=count.kind, next_cursor=next_cursor
+    )
+
+
+@router.get("/export")
+async def export_users(
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:read:any"])],
+    q: str | None = Query(default=None, description="Поиск по username"),
+    is_active: bool | None = Query(default=None, description="Фильтр активности"),
+    format: ExportFormat = Query(default=ExportFormat.NDJSON, description="Формат выгрузки")
 ):
-    users, count = await list_users_with_count(session, q, is_active, limit, offset)
-    return UsersOut(data=users, count=count)
+    return export_response(export_users_stmt(q, is_active), format, filename="users")
 
 
+# достаточно данных из токена, поэтому get_token_principal, а не get_current_user
 @router.get("/me", response_model=UserOut)
 async def get_me(
-    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:read:own"])]
+    current_user: Annotated[TokenPrincipal, Security(get_token_principal, scopes=["users:read:own"])]
 ):
     return await users_service.get_me(current_user)
 
@@ -78,21 +148,28 @@ async def get_user_items(
     current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:read:any"])],
     q: str | None = Query(default=None, description='Поиск по названию'),
     limit: int = Query(default=20, ge=1, le=100, description='Количество записей на странице'),
-    offset: int = Query(default=0, ge=0, description='Сколько записей пропустить') 
+    offset: int = Query(default=0, ge=0, description='Сколько записей пропустить'),
+    count: CountStrategy | None = Query(default=None, description='Как считать count (по умолчанию - из настроек)'),
+    with_description: bool = Query(default=True, description='Включать description (false - колонка не читается из БД)')
 ):
     user = await get_user(session=session, user_id=user_id)
     if user is None:
         raise HTTPException(status_code=404, detail='User not found')
     
-    items, count = await list_items_with_count(
+    rows, count = await list_items_with_count(
         session=session,
         q=q,
         limit=limit,
         offset=offset,
-        user_id=user_id
+        user_id=user_id,
+        count_strategy=count,
+        columns=item_out_columns(with_description)
     )
 
-    return ItemsOut(data=items, count=count)
+    return page_response(
+        ItemsOut, ItemOut, rows, None if with_description else {'description'},
+        count=count.value, count_kind=count.kind
+    )
 
 
 @router.patch("/me", response_model=UserOut)
@@ -131,6 +208,18 @@ async def patch_user(
     return db_user
 
 
+@router.post("/{user_id}/revoke-tokens", response_model=UserOut)
+async def revoke_tokens(
+    user_id: UUID,
+    session: SessionDep,
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:write:any"])]
+):
+    user = await get_user(session, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await revoke_user_tokens(session, user)
+
+
 @router.delete("/{user_id}")
 async def delete_user_by_id(
     user_id: UUID, 
@@ -1,6 +1,16 @@
-from fastapi import HTTPException, APIRouter
+from typing import Annotated, Literal
+
+from fastapi import HTTPException, APIRouter, Query, Security
 from sqlalchemy import text
-from app.deps import SessionDep
+from app.access import AccessUser
+from app.core.cache import principal_cache, token_cache
+from app.core.db_engine import pool_status
+from app.core.hashing import hashing_service
+from app.core.rehash import rehash_queue
+from app.core.slow_queries import slow_query_log
+from app.core.sql_stats import sql_stats
+from app.database import engine
+from app.deps import SessionDep, get_current_user
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -10,4 +20,59 @@ async def check_db(db: SessionDep):
         await db.exec(text("SELECT 1"))
         return {"status": "OK"}
     except Exception:
-        raise HTTPException(status_code=503, detail="База данных недоступна")
\ No newline at end of file
+        raise HTTPException(status_code=503, detail="База данных недоступна")
+
+
+@router.get("/hashing")
+async def hashing_stats(
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:read:any"])]
+):
+    return {
+        "pool": hashing_service.stats(),
+        "rehash": rehash_queue.stats()
+    }
+
+
+@router.get("/auth-cache")
+async def auth_cache_stats(
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:read:any"])]
+):
+    return {
+        "tokens": token_cache.stats(),
+        "principals": principal_cache.stats()
+    }
+
+
+@router.get("/slow-queries")
+async def slow_queries(
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:read:any"])]
+):
+    # пусто, пока журнал не включен через SLOW_QUERY_LOG
+    return {
+        "stats": slow_query_log.stats(),
+        "queries": slow_query_log.entries()
+    }
+
+
+@router.get("/sql-stats")
+async def sql_stats_report(
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:read:any"])],
+    limit: int = Query(default=50, ge=1, le=500, description="Сколько форм запросов вернуть"),
+    order_by: Literal["total_ms", "calls", "mean_ms", "p95_ms", "rows"] = Query(default="total_ms")
+):
+    return sql_stats.report(limit=limit, order_by=order_by)
+
+
+@router.post("/sql-stats/reset")
+async def sql_stats_reset(
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:write:any"])]
+):
+    sql_stats.reset()
+    return {"status": "reset"}
+
+
+@router.get("/db-pool")
+async def db_pool_stats(
+    current_user: Annotated[AccessUser, Security(get_current_user, scopes=["users:read:any"])]
+):
+    return pool_status(engine)
@@ -1,10 +1,23 @@
 from uuid import UUID
 
+from pydantic import ValidationError
+from sqlalchemy import Select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.access import AccessUser
-from app.models.items import Item, ItemUpdate, ItemCreate
-from app.models.users import User
+from app.core.bulk_jobs import bulk_jobs
+from app.core.config import settings
+from app.core.counting import CountStrategy, PageCount
+from app.database import AsyncSessionLocal
+from app.models.items import (
+    Item,
+    ItemUpdate,
+    ItemCreate,
+    ItemBulkResult,
+    ItemsBulkOut,
+    ItemsBulkFilter,
+    ItemsBulkJob
+)
 from app.repositories import items as items_repo
 from app.repositories import users as users_repo
 
@@ -17,21 +30,125 @@ async def create_item(
     '''
     Создать новый item для текущего пользователя.
     '''
-    owner = await session.get(User, current_user.user.id)
     return await items_repo.create_item(
         session=session,
-        user=owner,
+        user_id=current_user.user_id,
         item_data=item_data
     )
 
 
+async def create_items_bulk(
+    session: AsyncSession,
+    owner_id: UUID,
+    raw_items: list[dict]
+) -> ItemsBulkOut:
+    '''
+    Создать пачку items для owner_id: каждая строка проверяется через ItemCreate,
+    корректные вставляются одним запросом, для остальных возвращаются ошибки.
+    '''
+    results = [ItemBulkResult(index=index) for index in range(len(raw_items))]
+    valid: list[tuple[int, ItemCreate]] = []
+    for index, raw in enumerate(raw_items):
+        try:
+            valid.append((index, ItemCreate.model_validate(raw)))
+        except ValidationError as e:
+            results[index].errors = e.errors(include_url=False, include_context=False, include_input=False)
+
+    created = await items_repo.create_items_bulk(
+        session=session,
+        user_id=owner_id,
+        items_data=[item for _, item in valid]
+    )
+    for (index, _), item in zip(valid, created):
+        results[index].item = item
+
+    return ItemsBulkOut(created=len(created), failed=len(raw_items) - len(created), results=results)
+
+
+async def run_items_bulk(
+    session: AsyncSession,
+    current_user: AccessUser,
+    criteria: ItemsBulkFilter,
+    job: ItemsBulkJob,
+    values: dict | None = None
+) -> ItemsBulkJob:
+    '''
+    Изменить (values) или удалить (values=None) все items под фильтром
+    пачками по ITEMS_BULK_CHUNK_SIZE, каждая пачка - отдельная транзакция.
+    Правило доступа (свои или любые items) добавляется в WHERE, 
+    а не проверяется по строкам в Python. Прогресс пишется в job.
+    '''
+    conditions = items_repo.bulk_items_conditions(q=criteria.q, user_id=criteria.user_id, ids=criteria.ids)
+    conditions.append(current_user.can_where("items", "write", Item.user_id))
+
+    after_id = None
+    while True:
+        if values is None:
+            ids = await items_repo.delete_items_chunk(
+                session=session,
+                conditions=conditions,
+                after_id=after_id,
+                limit=settings.ITEMS_BULK_CHUNK_SIZE
+            )
+        else:
+            ids = await items_repo.update_items_chunk(
+                session=session,
+                conditions=conditions,
+                values=values,
+                after_id=after_id,
+                limit=settings.ITEMS_BULK_CHUNK_SIZE
+            )
+        # в отличие от обычных запросов коммитим сами, после каждой пачки:
+        # одна транзакция на все пачки держала бы блокировки всех строк
+        await session.commit()
+        if not ids:
+            return job
+        job.affected += len(ids)
+        job.chunks += 1
+        after_id = max(ids)
+
+
+def start_items_bulk_job(
+    current_user: AccessUser,
+    criteria: ItemsBulkFilter,
+    job: ItemsBulkJob,
+    values: dict | None = None
+) -> ItemsBulkJob:
+    '''
+    То же, что run_items_bulk, но в фоновой задаче со своей сессией.
+    '''
+    async def run(job: ItemsBulkJob) -> None:
+        async with AsyncSessionLocal() as session:
+            await run_items_bulk(
+                session=session,
+                current_user=current_user,
+                criteria=criteria,
+                job=job,
+                values=values
+            )
+
+    return bulk_jobs.start(job, run)
+
+
+def get_items_bulk_job(current_user: AccessUser, job_id: UUID) -> ItemsBulkJob | None:
+    '''
+    Статус фоновой операции виден тому, кто ее запустил, и admin.
+    '''
+    job = bulk_jobs.get(job_id)
+    if job is None or not current_user.can("items", "write", owner_id=job.owner_id):
+        return None
+    return job
+
+
 async def get_items_with_count(
     session: AsyncSession,
     current_user: AccessUser,
     q: str | None,
     limit: int,
-    offset: int
-) -> tuple[list[Item], int]:
+    offset: int,
+    count_strategy: CountStrategy | None = None,
+    columns: tuple | None = None
+) -> tuple[list[Item], PageCount]:
     '''
     Вернуть список items и общее количество записей с учетом прав: 
     user получает только свои items, admin - все.
@@ -48,10 +165,51 @@ async def get_items_with_count(
         q=q,
         user_id=user_id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        count_strategy=count_strategy,
+        columns=columns
     )
 
 
+async def get_items_page_after(
+    session: AsyncSession,
+    current_user: AccessUser,
+    q: str | None,
+    limit: int,
+    after: tuple[str, UUID] | None,
+    columns: tuple | None = None
+) -> tuple[list[Item], tuple[str, UUID] | None]:
+    '''
+    То же, что get_items_with_count, но в режиме курсора: 
+    страница после ключа (title, id) и ключ следующей страницы.
+    '''
+    if current_user.can("items", "read"):
+        user_id = None
+    else:
+        user_id = current_user.user.id
+
+    return await items_repo.list_items_after(
+        session=session,
+        q=q,
+        user_id=user_id,
+        limit=limit,
+        after=after,
+        columns=columns
+    )
+
+
+def get_items_export_stmt(current_user: AccessUser, q: str | None) -> Select:
+    '''
+    Запрос для выгрузки items с теми же правами, что и get_items_with_count.
+    '''
+    if current_user.can("items", "read"):
+        user_id = None
+    else:
+        user_id = current_user.user.id
+
+    return items_repo.export_items_stmt(q=q, user_id=user_id)
+
+
 async def get_item_for_read(
     session: AsyncSession,
     current_user: AccessUser,
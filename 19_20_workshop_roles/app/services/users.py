@@ -1,15 +1,20 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.access import AccessUser
-from app.models.users import User, UserUpdate
+from app.access import AccessUser, TokenPrincipal
+from app.models.users import User, UserOut, UserUpdate
 from app.repositories.users import get_user_by_username, update_user
 
 
-async def get_me(current_user: AccessUser) -> User:
+async def get_me(current_user: TokenPrincipal) -> UserOut:
     '''
-    Вернуть данные текущего авторизованного пользователя.
+    Вернуть данные текущего авторизованного пользователя 
+    (снимок из токена, без обращения к БД).
     '''
-    return current_user.user
+    return UserOut(
+        id=current_user.id,
+        username=current_user.username,
+        is_active=current_user.is_active
+    )
 
 
 async def patch_me(
@@ -0,0 +1,79 @@
+'''
+Микробенчмарк проверки scopes: старый строковый путь против битовых масок.
+
+Запуск из папки проекта:
+    python -m benchmarks.bench_scopes
+'''
+import timeit
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+from app.access import AccessUser
+from app.core.scopes import required_mask, scope_mask
+from app.core.security import ROLE_TO_SCOPES
+from app.models import items
+from app.models.users import User
+
+NUMBER = 200_000
+
+user = User(id=uuid4(), username="bench", hashed_password="")
+other_id = uuid4()
+scopes_list = sorted(ROLE_TO_SCOPES["user"])
+admin_scopes_list = sorted(ROLE_TO_SCOPES["admin"])
+route_scopes = ["items:read:own"]
+
+
+@dataclass
+class StringAccessUser:
+    # прежняя реализация AccessUser на списке строк
+    user: User
+    scopes: list[str]
+
+    def can(self, resource: str, action: str, owner_id: UUID | None = None) -> bool:
+        if f"{resource}:{action}:any" in self.scopes:
+            return True
+        if owner_id is not None and owner_id == self.user.id:
+            return f"{resource}:{action}:own" in self.scopes
+        return False
+
+
+def check_route_strings(token_scope: str) -> bool:
+    # прежняя проверка в get_current_user: split + цикл по требуемым scopes
+    token_scopes = token_scope.split()
+    for scope in route_scopes:
+        if scope not in token_scopes:
+            return False
+    return True
+
+
+def check_route_mask(token_mask: int) -> bool:
+    # новая проверка в get_current_user
+    need = required_mask(tuple(route_scopes))
+    return token_mask & need == need
+
+
+def main() -> None:
+    access_user = AccessUser(user=user, mask=scope_mask(scopes_list))
+    access_admin = AccessUser(user=user, mask=scope_mask(admin_scopes_list))
+    string_user = StringAccessUser(user=user, scopes=scopes_list)
+    string_admin = StringAccessUser(user=user, scopes=admin_scopes_list)
+    token_scope = " ".join(scopes_list)
+    token_mask = access_user.mask
+
+    cases = {
+        "can() user: строки": lambda: string_user.can("items", "write", other_id),
+        "can() user: маска": lambda: access_user.can("items", "write", other_id),
+        "can() admin: строки": lambda: string_admin.can("items", "write", other_id),
+        "can() admin: маска": lambda: access_admin.can("items", "write", other_id),
+        "can() без прав: строки": lambda: string_user.can("users", "read"),
+        "can() без прав: маска": lambda: access_user.can("users", "read"),
+        "scopes эндпоинта: строки": lambda: check_route_strings(token_scope),
+        "scopes эндпоинта: маска": lambda: check_route_mask(token_mask),
+    }
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=NUMBER, repeat=7))
+        print(f"{name:<28} {best / NUMBER * 1e9:8.1f} нс/вызов")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+'''
+Нагрузочный тест: p99 у GET /items до и во время "шторма" логинов.
+
+Если хэширование паролей блокирует event loop, p99 чтения items 
+во время шторма вырастает до десятков/сотен миллисекунд.
+С пулом процессов (app/core/hashing.py) он должен оставаться почти прежним.
+
+Запуск (нужен httpx: pip install httpx):
+    uvicorn app.main:app
+    python -m benchmarks.load_login_storm --username admin --password ...
+'''
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> httpx.Response:
+    return await client.post(
+        "/login/access-token",
+        data={"username": username, "password": password}
+    )
+
+
+async def probe_items(client: httpx.AsyncClient, headers: dict, duration: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/items/", headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+async def login_storm(client: httpx.AsyncClient, args, stop: asyncio.Event, codes: dict) -> None:
+    while not stop.is_set():
+        response = await login(client, args.username, args.password)
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+
+
+def report(name: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<12} запросов={len(latencies):<6} "
+        f"p50={quantiles[49]:7.1f} мс  p99={quantiles[98]:7.1f} мс"
+    )
+
+
+async def main(args) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        response = await login(client, args.username, args.password)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        report("без шторма", await probe_items(client, headers, args.duration))
+
+        stop = asyncio.Event()
+        codes: dict[int, int] = {}
+        storm = [
+            asyncio.create_task(login_storm(client, args, stop, codes))
+            for _ in range(args.concurrency)
+        ]
+        latencies = await probe_items(client, headers, args.duration)
+        stop.set()
+        await asyncio.gather(*storm)
+
+        report("шторм", latencies)
+        print(f"ответы логина во время шторма: {codes}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
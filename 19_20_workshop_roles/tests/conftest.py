@@ -0,0 +1,32 @@
+'''
+Тесты работают с базой из settings.DATABASE_URL (схема - alembic upgrade head).
+Запуск из папки проекта:
+    python -m pytest tests
+'''
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine():
+    '''
+    Отдельный движок на тест: обработчики событий, которые ставит тест,
+    не попадают на движок приложения и исчезают вместе с этим движком.
+    '''
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"database is not available: {e}")
+    yield engine
+    await engine.dispose()
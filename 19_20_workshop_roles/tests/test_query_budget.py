@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import query_budget
+from app.core.counting import CountStrategy
+from app.core.query_budget import assert_max_queries
+from app.core.slow_queries import SlowQueryLog
+from app.repositories.items import list_items_with_count
+
+pytestmark = pytest.mark.anyio
+
+
+async def _list_items(engine) -> None:
+    # страница и отдельный SELECT count(*) - ровно 2 запроса
+    async with AsyncSession(engine) as session:
+        await list_items_with_count(session, None, None, 10, 0, count_strategy=CountStrategy.EXACT_SEPARATE)
+
+
+async def test_assert_max_queries_passes_at_limit(engine):
+    query_budget.install(engine)
+    with assert_max_queries(2) as counter:
+        await _list_items(engine)
+    assert counter.total == 2
+
+
+async def test_assert_max_queries_raises_over_limit(engine):
+    query_budget.install(engine)
+    with pytest.raises(AssertionError, match="at most 1 SQL statements, got 2"):
+        with assert_max_queries(1):
+            await _list_items(engine)
+
+
+async def test_assert_max_queries_ignores_slow_query_explains(engine):
+    query_budget.install(engine)
+    slow_log = SlowQueryLog(threshold_ms=0, sample_rate=1, maxlen=10, explain_timeout_ms=5000, max_pending=10)
+    slow_log.install(engine)
+    with assert_max_queries(2):
+        await _list_items(engine)
+        while slow_log.stats()["pending"]:
+            await asyncio.sleep(0.01)
+    assert slow_log.explained == 2
@@ -0,0 +1,26 @@
+from typing import Annotated
+
+import pytest
+from fastapi import APIRouter, Security
+
+from app.access import AccessUser
+from app.core.scopes import required_mask
+from app.deps import check_route_scopes, get_current_user
+
+
+def test_unknown_route_scope_fails_at_startup():
+    router = APIRouter(prefix="/things")
+
+    @router.get("/")
+    async def read_things(
+        current_user: Annotated[AccessUser, Security(get_current_user, scopes=["items:read:anyy"])]
+    ):
+        return []
+
+    with pytest.raises(ValueError, match=r"GET /things/: Unknown scopes: items:read:anyy"):
+        check_route_scopes(router.routes)
+
+
+def test_required_mask_rejects_unknown_scope():
+    with pytest.raises(ValueError, match="Unknown scopes: items:read:anyy"):
+        required_mask(("items:read:own", "items:read:anyy"))
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.counting import CountStrategy
+from app.core.slow_queries import SlowQueryLog
+from app.core.sql_stats import SqlStats
+from app.repositories.items import list_items_with_count
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_slow_query_explains_are_not_in_sql_stats(engine):
+    stats = SqlStats(max_statements=100, samples=16)
+    stats.install(engine)
+    # каждый SELECT "медленный" и объясняется
+    slow_log = SlowQueryLog(threshold_ms=0, sample_rate=1, maxlen=10, explain_timeout_ms=5000, max_pending=10)
+    slow_log.install(engine)
+
+    async with AsyncSession(engine) as session:
+        await list_items_with_count(session, None, None, 10, 0, count_strategy=CountStrategy.EXACT_SEPARATE)
+    while slow_log.stats()["pending"]:
+        await asyncio.sleep(0.01)
+    assert slow_log.explained == 2
+
+    fingerprints = [row["fingerprint"] for row in stats.report(limit=100)["items"]]
+    assert len(fingerprints) == 2
+    assert not [fp for fp in fingerprints if fp.startswith(("EXPLAIN", "SET LOCAL"))]
@@ -3,14 +3,13 @@ from uuid import UUID
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.returning import insert_returning, update_returning
 from app.models.job import JobDB, JobStatus, JobCreate
 
 
 async def create_job(session: AsyncSession, data: JobCreate) -> JobDB:
-    job = JobDB(title=data.title)
-    session.add(job)
+    job = await insert_returning(session, JobDB, {"title": data.title})
     await session.commit()
-    await session.refresh(job)
     return job
 
 
@@ -25,13 +24,12 @@ async def set_status(
     finished_at: datetime | None = None,
     error: str | None = None,
 ) -> JobDB:
-    job.status = status
+    values = {"status": status}
     if finished_at is not None:
-        job.finished_at = finished_at
+        values["finished_at"] = finished_at
     if error is not None:
-        job.error = error
+        values["error"] = error
 
-    session.add(job)
+    job = await update_returning(session, job, values)
     await session.commit()
-    await session.refresh(job)
     return job
\ No newline at end of file
@@ -7,6 +7,7 @@ from sqlmodel import SQLModel
 
 from app.models.reviews import ReviewDB
 from app.models.books import BookDB
+from app.models.ratings import ReviewStatsDB
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,44 @@
+"""add trigram search indexes
+
+Revision ID: a4e7c2d19b83
+Revises: f5c3870d9a91
+Create Date: 2026-10-17 13:24:51.117402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e7c2d19b83'
+down_revision: Union[str, Sequence[str], None] = 'f5c3870d9a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE EXTENSION требует прав владельца БД (или суперпользователя)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY не блокирует запись в таблицу, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_books_title_trgm", "books", ["title"], unique=False,
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_books_author_trgm", "books", ["author"], unique=False,
+            postgresql_using="gin", postgresql_ops={"author": "gin_trgm_ops"},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_books_author_trgm", table_name="books", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_books_title_trgm", table_name="books", postgresql_concurrently=True, if_exists=True)
+    # расширение не удаляем: им могут пользоваться и другие объекты БД
@@ -0,0 +1,59 @@
+"""add full text search vectors
+
+Revision ID: b2f6d8e05c17
+Revises: a4e7c2d19b83
+Create Date: 2026-10-17 14:02:36.480529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f6d8e05c17'
+down_revision: Union[str, Sequence[str], None] = 'a4e7c2d19b83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED-колонка пересчитывается для всех строк: таблица переписывается под блокировкой
+    op.add_column("books", sa.Column(
+        "search_vector",
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(author, '')), 'B') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.add_column("reviews", sa.Column(
+        "search_vector",
+        postgresql.TSVECTOR(),
+        sa.Computed("setweight(to_tsvector('russian', coalesce(text, '')), 'C')", persisted=True),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_books_search_vector", "books", ["search_vector"], unique=False,
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_reviews_search_vector", "reviews", ["search_vector"], unique=False,
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_reviews_search_vector", table_name="reviews", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_books_search_vector", table_name="books", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("reviews", "search_vector")
+    op.drop_column("books", "search_vector")
@@ -0,0 +1,57 @@
+"""add rating aggregates
+
+Revision ID: c7a1e5f39d24
+Revises: b2f6d8e05c17
+Create Date: 2026-10-17 16:21:08.913402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a1e5f39d24'
+down_revision: Union[str, Sequence[str], None] = 'b2f6d8e05c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+AGGREGATE_COLUMNS = ("rating_count", "rating_sum", "rating_1", "rating_2", "rating_3", "rating_4", "rating_5")
+
+# те же выражения, что в app/repositories/ratings.reconcile_rating_stats
+AGGREGATE_SELECT = (
+    "count(r.id), coalesce(sum(r.rating), 0), "
+    + ", ".join(f"count(r.id) FILTER (WHERE r.rating = {value})" for value in range(1, 6))
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # с постоянным DEFAULT колонки добавляются без переписывания таблицы
+    for name in AGGREGATE_COLUMNS:
+        op.add_column("books", sa.Column(name, sa.Integer(), server_default="0", nullable=False))
+
+    op.create_table('review_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    *(sa.Column(name, sa.Integer(), server_default="0", nullable=False) for name in AGGREGATE_COLUMNS),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # заполняем счетчики по уже существующим отзывам
+    columns = ", ".join(AGGREGATE_COLUMNS)
+    op.execute(
+        f"UPDATE books AS b SET ({columns}) = "
+        f"(SELECT {AGGREGATE_SELECT} FROM reviews AS r WHERE r.book_id = b.id)"
+    )
+    op.execute(
+        f"INSERT INTO review_stats (id, {columns}) "
+        f"SELECT 1, {AGGREGATE_SELECT} FROM reviews AS r"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('review_stats')
+    for name in reversed(AGGREGATE_COLUMNS):
+        op.drop_column("books", name)
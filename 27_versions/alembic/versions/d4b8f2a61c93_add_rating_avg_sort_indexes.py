@@ -0,0 +1,46 @@
+"""add rating avg and sort indexes
+
+Revision ID: d4b8f2a61c93
+Revises: c7a1e5f39d24
+Create Date: 2026-10-17 17:05:42.118236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8f2a61c93'
+down_revision: Union[str, Sequence[str], None] = 'c7a1e5f39d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED-колонка пересчитывается для всех строк: таблица переписывается под блокировкой
+    op.add_column("books", sa.Column(
+        "rating_avg",
+        sa.Double(),
+        sa.Computed("rating_sum::double precision / NULLIF(rating_count, 0)", persisted=True),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_books_rating_avg_id", "books", [sa.text("rating_avg NULLS FIRST"), "id"], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_books_rating_count_id", "books", ["rating_count", "id"], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_books_rating_count_id", table_name="books", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_books_rating_avg_id", table_name="books", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("books", "rating_avg")
@@ -2,7 +2,9 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
 
+from app.core.counting import CountStrategy
 from app.core.database import SessionDep
+from app.core.responses import page_response
 from app.models.books import BookCreate, BookOut, BookUpdate, BookGenre, BooksOut
 from app.services.books import book_service, ValidationServiceError
 
@@ -45,12 +47,14 @@ async def list_books(
             year_to=year_to,
             limit=limit,
             offset=offset,
+            # в v1 count обязателен, поэтому всегда точный
+            count_strategy=CountStrategy.EXACT_SEPARATE,
         )
     except ValidationServiceError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
     # версия v1 - старый контракт
-    return {"data": books, "count": count}
+    return page_response(BooksOut, BookOut, books, "data", count=count.value)
 
 
 @router.patch("/{book_id}", response_model=BookOut)
@@ -2,6 +2,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
 
+from app.core.counting import CountStrategy
 from app.core.database import SessionDep
 from app.models.reviews import ReviewCreate, ReviewOut, ReviewsOut, ReviewUpdate
 from app.services.reviews import review_service, ValidationServiceError
@@ -23,9 +24,12 @@ async def create_review(book_id: UUID, payload: ReviewCreate, session: SessionDe
 
 @router.get("/reviews", response_model=ReviewsOut)
 async def list_reviews(session: SessionDep, limit: int = 50, offset: int = 0):
-    reviews, count = await review_service.list_with_count(session=session, limit=limit, offset=offset)
+    # в v1 count обязателен, поэтому всегда точный
+    reviews, count = await review_service.list_with_count(
+        session=session, limit=limit, offset=offset, count_strategy=CountStrategy.EXACT_SEPARATE
+    )
     # версия v1 - старый контракт
-    return {"data": reviews, "count": count}
+    return {"data": reviews, "count": count.value}
 
 
 @router.get("/reviews/{review_id}", response_model=ReviewOut)
@@ -38,9 +42,11 @@ async def get_review_by_id(review_id: UUID, session: SessionDep):
 
 @router.get("/books/{book_id}/reviews", response_model=ReviewsOut)
 async def list_reviews_by_book(book_id: UUID, session: SessionDep, limit: int = 50, offset: int = 0):
-    reviews, count = await review_service.list_with_count(session=session, book_id=book_id, limit=limit, offset=offset)
+    reviews, count = await review_service.list_with_count(
+        session=session, book_id=book_id, limit=limit, offset=offset, count_strategy=CountStrategy.EXACT_SEPARATE
+    )
     # версия v1 - старый контракт
-    return {"data": reviews, "count": count}
+    return {"data": reviews, "count": count.value}
 
 
 @router.patch("/reviews/{review_id}", response_model=ReviewOut)
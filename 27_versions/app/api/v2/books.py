@@ -2,7 +2,10 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query
 
+from app.core.counting import CountStrategy
 from app.core.database import SessionDep
+from app.core.export import ExportFormat, export_response
+from app.core.responses import page_response
 from app.services.books import book_service, ValidationServiceError
 # указываем экспорт моделей из v2 для единообразия и удобства
 from app.models.v2.books import (
@@ -11,6 +14,7 @@ from app.models.v2.books import (
     BookOut,
     BooksOut,
     BookGenre,
+    BookSort,
     PageMeta,
 )
 
@@ -27,6 +31,19 @@ async def create_book(payload: BookCreate, session: SessionDep):
     return BookOut.model_validate(book, from_attributes=True)
 
 
+# объявлен раньше /{book_id}, иначе "export" разбирался бы как book_id
+@router.get("/export")
+async def export_books(
+    q: str | None = None,
+    genre: BookGenre | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
+    format: ExportFormat = Query(default=ExportFormat.NDJSON, description="Формат выгрузки"),
+):
+    stmt = book_service.export_stmt(q=q, genre=genre, year_from=year_from, year_to=year_to)
+    return export_response(stmt, format, filename="books")
+
+
 @router.get("/{book_id}", response_model=BookOut)
 async def get_book(book_id: UUID, session: SessionDep):
     book = await book_service.get(session, book_id)
@@ -44,6 +61,9 @@ async def list_books(
     year_to: int | None = None,
     limit: int = Query(default=50, ge=1, le=200, description="Количество записей на странице"),
     offset: int = Query(default=0, ge=0, description="Сколько записей пропустить"),
+    count: CountStrategy | None = Query(default=None, description="Как считать count (по умолчанию - из настроек)"),
+    with_description: bool = Query(default=True, description="Включать description (false - колонка не читается из БД)"),
+    sort: BookSort = Query(default=BookSort.TITLE, description="Порядок: title, rating, -rating, reviews"),
 ):
     try:
         books, count = await book_service.list_with_count(
@@ -54,19 +74,26 @@ async def list_books(
             year_to=year_to,
             limit=limit,
             offset=offset,
+            count_strategy=count,
+            with_description=with_description,
+            with_ratings=True,
+            sort=sort,
         )
     except ValidationServiceError as e:
         raise HTTPException(status_code=422, detail=str(e))
     # добавляем вычисление параметров next_offset и prev_offset
-    next_offset = offset + limit if (offset + limit) < count else None
+    next_offset = offset + limit if count.has_more(offset, len(books), limit) else None
     prev_offset = offset - limit if (offset - limit) >= 0 else None
-    # складываем все книги в отдельный список
-    items = [BookOut.model_validate(b, from_attributes=True) for b in books]
-    # возвращаем BooksOut по версии v2
-    return BooksOut(
-        items=items,
-        metainfo=PageMeta(
-            count=count,
+    # возвращаем BooksOut по версии v2: книги - строки проекции, без повторной валидации
+    return page_response(
+        BooksOut,
+        BookOut,
+        books,
+        "items",
+        None if with_description else {"description"},
+        metainfo=PageMeta.model_construct(
+            count=count.value,
+            count_kind=count.kind,
             limit=limit,
             offset=offset,
             next_offset=next_offset,
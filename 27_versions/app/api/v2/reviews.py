@@ -2,6 +2,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query
 
+from app.core.counting import CountStrategy
 from app.core.database import SessionDep
 from app.services.reviews import review_service, ValidationServiceError
 # указываем экспорт моделей из v2 для единообразия и удобства
@@ -33,10 +34,13 @@ async def list_reviews(
     session: SessionDep,
     limit: int = Query(default=50, ge=1, le=200, description="Количество записей на странице"),
     offset: int = Query(default=0, ge=0, description="Сколько записей пропустить"),
+    count: CountStrategy | None = Query(default=None, description="Как считать count (по умолчанию - из настроек)"),
 ):
-    reviews, count = await review_service.list_with_count(session=session, limit=limit, offset=offset)
+    reviews, count = await review_service.list_with_count(
+        session=session, limit=limit, offset=offset, count_strategy=count
+    )
 
-    next_offset = offset + limit if (offset + limit) < count else None
+    next_offset = offset + limit if count.has_more(offset, len(reviews), limit) else None
     prev_offset = offset - limit if (offset - limit) >= 0 else None
 
     items = [ReviewOut.model_validate(r, from_attributes=True) for r in reviews]
@@ -44,7 +48,8 @@ async def list_reviews(
     return ReviewsOut(
         items=items,
         metainfo=PageMeta(
-            count=count,
+            count=count.value,
+            count_kind=count.kind,
             limit=limit,
             offset=offset,
             next_offset=next_offset,
@@ -67,10 +72,13 @@ async def list_reviews_by_book(
     session: SessionDep,
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    count: CountStrategy | None = Query(default=None, description="Как считать count (по умолчанию - из настроек)"),
 ):
-    reviews, count = await review_service.list_with_count(session=session, book_id=book_id, limit=limit, offset=offset)
+    reviews, count = await review_service.list_with_count(
+        session=session, book_id=book_id, limit=limit, offset=offset, count_strategy=count
+    )
     # добавляем вычисление параметров next_offset и prev_offset
-    next_offset = offset + limit if (offset + limit) < count else None
+    next_offset = offset + limit if count.has_more(offset, len(reviews), limit) else None
     prev_offset = offset - limit if (offset - limit) >= 0 else None
     # складываем все отзывы в отдельный список
     items = [ReviewOut.model_validate(r, from_attributes=True) for r in reviews]
@@ -78,7 +86,8 @@ async def list_reviews_by_book(
     return ReviewsOut(
         items=items,
         metainfo=PageMeta(
-            count=count,
+            count=count.value,
+            count_kind=count.kind,
             limit=limit,
             offset=offset,
             next_offset=next_offset,
@@ -2,7 +2,9 @@ from fastapi import APIRouter
 
 from app.api.v2.books import router as books_router
 from app.api.v2.reviews import router as reviews_router
+from app.api.v2.search import router as search_router
 
 router = APIRouter()
 router.include_router(books_router)
-router.include_router(reviews_router)
\ No newline at end of file
+router.include_router(reviews_router)
+router.include_router(search_router)
\ No newline at end of file
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.database import SessionDep
+from app.models.search import SearchKind, SearchOut
+from app.services.books import ValidationServiceError
+from app.services.search import search_service
+
+router = APIRouter(prefix="/search", tags=["Search v2"])
+
+
+@router.get("", response_model=SearchOut)
+async def search(
+    session: SessionDep,
+    q: str = Query(min_length=1, max_length=200, description="Поисковый запрос (слова, \"фраза\", or, -исключение)"),
+    kind: SearchKind | None = Query(default=None, description="Искать только книги или только отзывы"),
+    limit: int = Query(default=20, ge=1, le=100, description="Количество записей на странице"),
+    after: str | None = Query(default=None, description="Курсор следующей страницы (next_cursor)"),
+):
+    try:
+        items, next_cursor = await search_service.search(
+            session=session, q=q, kind=kind, limit=limit, after=after
+        )
+    except ValidationServiceError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return SearchOut(items=items, next_cursor=next_cursor)
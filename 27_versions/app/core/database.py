@@ -1,11 +1,11 @@
 from typing import Annotated
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import Depends
-from app.core.settings import settings
+from app.core.db_engine import create_engine_from_settings
 
-engine = create_async_engine(settings.database_url, echo=settings.DB_ECHO)
+engine = create_engine_from_settings()
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine, 
@@ -14,8 +14,23 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 async def get_session():
+    """
+    Сессия и транзакция на время обработчика запроса (unit of work).
+    Репозитории только выполняют запросы, а транзакция коммитится здесь
+    один раз после обработчика или откатывается, если он завершился
+    исключением (в том числе HTTPException). Соединение из пула сессия
+    берет только при первом обращении к БД, а scope="function" закрывает
+    сессию (и возвращает соединение в пул) сразу после обработчика,
+    до отправки ответа клиенту.
+    """
     async with AsyncSessionLocal() as session:
-        yield session
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        if session.in_transaction():
+            await session.commit()
 
-SessionDep = Annotated[AsyncSession, Depends(get_session)]
+SessionDep = Annotated[AsyncSession, Depends(get_session, scope="function")]
 
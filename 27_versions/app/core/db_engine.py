@@ -0,0 +1,122 @@
+import logging
+import random
+import time
+from collections import deque
+from typing import Any
+
+from sqlalchemy import event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.settings import settings
+
+# выборочное логирование SQL (DB_ECHO_SAMPLE_RATE) - вместо echo=True на каждый запрос
+sql_logger = logging.getLogger("app.sql")
+
+
+class PoolMetrics:
+    """
+    Сколько запросы ждали соединение из пула: число выдач, суммарное,
+    максимальное и p95 (по последним samples выдачам) время, таймауты.
+    Время включает открытие нового соединения, если пул его создавал.
+    """
+
+    def __init__(self, samples: int = 1024) -> None:
+        self.acquired = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._waits: deque[float] = deque(maxlen=samples)
+
+    def observe(self, wait_ms: float) -> None:
+        self.acquired += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self._waits.append(wait_ms)
+
+    def stats(self) -> dict[str, Any]:
+        ordered = sorted(self._waits)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return {
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "mean_wait_ms": round(self.total_wait_ms / self.acquired, 3) if self.acquired else 0.0,
+            "p95_wait_ms": round(p95, 3),
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Обычный пул asyncio-движка, который замеряет время получения соединения.
+    """
+
+    def __init__(self, *args, **kw) -> None:
+        super().__init__(*args, **kw)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self) -> "TimedQueuePool":
+        # engine.dispose() пересоздает пул, метрики переносим в новый
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _log_sampled_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    if random.random() < settings.DB_ECHO_SAMPLE_RATE:
+        sql_logger.info("%s", statement)
+
+
+def create_engine_from_settings() -> AsyncEngine:
+    """
+    Движок приложения с параметрами пула и драйвера из Settings.
+    """
+    url = make_url(settings.database_url)
+    connect_args = {}
+    if url.get_driver_name() == "asyncpg":
+        # кэш подготовленных выражений asyncpg на соединение; 0 - для pgbouncer в режиме transaction
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    if settings.DB_ECHO_SAMPLE_RATE > 0:
+        event.listen(engine.sync_engine, "before_cursor_execute", _log_sampled_statement)
+    return engine
+
+
+def pool_status(engine: AsyncEngine) -> dict[str, Any]:
+    """
+    Текущее состояние пула и время ожидания соединений.
+    """
+    pool = engine.pool
+    metrics = getattr(pool, "metrics", None)
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool": type(pool).__name__, "wait": metrics.stats() if metrics else None}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # > 0 - соединения сверх pool_size; отрицательное - еще не все соединения пула открыты
+        "overflow": pool.overflow(),
+        "wait": metrics.stats() if metrics else None,
+    }
@@ -0,0 +1,23 @@
+from sqlalchemy.sql.elements import ColumnElement
+
+LIKE_ESCAPE = "\\"
+
+
+def escape_like(value: str) -> str:
+    """
+    Экранировать %, _ и сам символ экранирования, чтобы они искались буквально.
+    """
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+def ilike_contains(column, q: str) -> ColumnElement[bool]:
+    """
+    Регистронезависимый поиск подстроки: column ILIKE '%q%'.
+    На PostgreSQL такой предикат обслуживает GIN-индекс с gin_trgm_ops
+    (при длине q от 3 символов), на SQLite SQLAlchemy сам строит lower(...) LIKE lower(...).
+    """
+    return column.ilike(f"%{escape_like(q)}%", escape=LIKE_ESCAPE)
@@ -0,0 +1,21 @@
+"""
+Пересчет счетчиков оценок книг и общей строки review_stats по таблице reviews.
+
+Запуск из каталога проекта: python -m app.core.reconcile_ratings
+Нужен после ручных правок reviews в обход приложения или для проверки расхождений.
+"""
+import asyncio
+
+from app.core.database import AsyncSessionLocal
+from app.repositories.ratings import reconcile_rating_stats
+
+
+async def reconcile() -> None:
+    async with AsyncSessionLocal() as session:
+        fixed = await reconcile_rating_stats(session)
+        await session.commit()
+    print(f"Rating stats reconciled, books fixed: {fixed}")
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile())
@@ -1,3 +1,6 @@
+from typing import Literal
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -19,7 +22,29 @@ class Settings(BaseSettings):
     DB_USER: str = "postgres"
     DB_PASSWORD: str = "1234"
     DB_NAME: str = "books_db"
+    # DB_ECHO пишет в лог каждый SQL, DB_ECHO_SAMPLE_RATE - только такую долю запросов
     DB_ECHO: bool = False
+    DB_ECHO_SAMPLE_RATE: float = Field(default=0.0, ge=0, le=1)
+
+    # пул соединений (app/core/db_engine.py): постоянные соединения, сверх них на пике,
+    # сколько секунд ждать свободное, через сколько секунд переоткрывать (-1 - никогда)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    # кэш подготовленных выражений asyncpg на соединение (0 - выключить)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # как считать count в списках (app/core/counting.py);
+    # estimated считает точно только до COUNT_ESTIMATE_THRESHOLD записей;
+    # exact_window - только явно: count(*) OVER () читает все строки под фильтром
+    # до LIMIT, и страница уже не берется коротким проходом по индексу
+    COUNT_STRATEGY: Literal["exact_window", "exact_separate", "estimated", "none"] = "exact_separate"
+    COUNT_ESTIMATE_THRESHOLD: int = 10_000
+
+    # сколько строк за раз читать из серверного курсора при выгрузке (app/core/export.py)
+    EXPORT_CHUNK_SIZE: int = 1000
 
     @property
     def database_url(self) -> str:
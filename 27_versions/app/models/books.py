@@ -1,9 +1,15 @@
 from uuid import UUID, uuid4
 from typing import TYPE_CHECKING
 
+from enum import StrEnum
+
+from sqlalchemy import Column, Computed, Double, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, SQLModel, Relationship
 
 from app.domain.book import BookGenre
+from app.models.ratings import RatingAggregates
+from app.models.search import SEARCH_CONFIG
 
 if TYPE_CHECKING:
     from app.models.reviews import ReviewDB
@@ -33,14 +39,59 @@ class BookOut(BookBase):
     id: UUID
 
 
+class BookSort(StrEnum):
+    """
+    Порядок списка книг (v2). Каждый вариант читается по своему индексу:
+    - title: по названию
+    - rating / -rating: по средней оценке; книги без отзывов в начале / в конце
+    - reviews: сначала книги с большим числом отзывов
+    """
+    TITLE = "title"
+    RATING = "rating"
+    RATING_DESC = "-rating"
+    REVIEWS = "reviews"
+
+
 class BooksOut(SQLModel):
     data: list[BookOut]
     count: int
 
 
-class BookDB(BookBase, table=True):
+class BookDB(BookBase, RatingAggregates, table=True):
     __tablename__ = "books"
+    # под ILIKE '%q%' в _apply_book_filters, нужен pg_trgm
+    __table_args__ = (
+        Index("ix_books_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_books_author_trgm", "author", postgresql_using="gin", postgresql_ops={"author": "gin_trgm_ops"}),
+        # полнотекстовый поиск (/api/v2/search): название важнее автора, автор важнее описания
+        Column(
+            "search_vector",
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(author, '')), 'B') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')",
+                persisted=True,
+            ),
+        ),
+        Index("ix_books_search_vector", "search_vector", postgresql_using="gin"),
+        # sort=rating - прямой проход, sort=-rating - обратный (DESC NULLS LAST, id DESC)
+        Index("ix_books_rating_avg_id", text("rating_avg NULLS FIRST"), "id"),
+        # sort=reviews - обратный проход
+        Index("ix_books_rating_count_id", "rating_count", "id"),
+    )
+    # колонку считает сама БД, в ORM-объекте она не нужна
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
+    # средняя оценка из счетчиков RatingAggregates, NULL - отзывов нет;
+    # хранится в строке, чтобы сортировка по ней шла по индексу
+    rating_avg: float | None = Field(
+        default=None,
+        sa_column=Column(
+            Double,
+            Computed("rating_sum::double precision / NULLIF(rating_count, 0)", persisted=True),
+        ),
+    )
 
     reviews: list["ReviewDB"] = Relationship(back_populates="book", passive_deletes="all")
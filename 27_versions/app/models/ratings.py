@@ -0,0 +1,29 @@
+from sqlmodel import Field, SQLModel
+
+# допустимые оценки отзыва, по одной колонке гистограммы на каждую
+RATING_VALUES = range(1, 6)
+
+# id единственной строки в review_stats
+GLOBAL_STATS_ID = 1
+
+
+class RatingAggregates(SQLModel):
+    """
+    Счетчики оценок, которые обновляются вместе с записью отзывов
+    (app/repositories/ratings.py), чтобы не агрегировать reviews на каждый запрос.
+    """
+    rating_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    rating_sum: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    rating_1: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    rating_2: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    rating_3: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    rating_4: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    rating_5: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+
+class ReviewStatsDB(RatingAggregates, table=True):
+    """Общие счетчики по всем отзывам, одна строка с id = GLOBAL_STATS_ID."""
+    __tablename__ = "review_stats"
+
+    id: int = Field(default=GLOBAL_STATS_ID, primary_key=True)
+
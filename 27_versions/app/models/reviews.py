@@ -1,8 +1,12 @@
 from uuid import UUID, uuid4
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, SQLModel, Relationship
 
+from app.models.search import SEARCH_CONFIG
+
 if TYPE_CHECKING:
     from app.models.books import BookDB
 
@@ -33,6 +37,20 @@ class ReviewsOut(SQLModel):
 
 class ReviewDB(ReviewBase, table=True):
     __tablename__ = "reviews"
+    # полнотекстовый поиск по тексту отзыва (/api/v2/search)
+    __table_args__ = (
+        Column(
+            "search_vector",
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(text, '')), 'C')",
+                persisted=True,
+            ),
+        ),
+        Index("ix_reviews_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    # колонку считает сама БД, в ORM-объекте она не нужна
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     book_id: UUID = Field(foreign_key="books.id", nullable=False, ondelete="CASCADE")
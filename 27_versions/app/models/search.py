@@ -0,0 +1,31 @@
+from enum import StrEnum
+from uuid import UUID
+
+from sqlmodel import SQLModel
+
+# конфигурация полнотекстового поиска: русские слова со стеммингом,
+# латиница в конфигурации russian обрабатывается английским стеммером
+SEARCH_CONFIG = "russian"
+
+
+class SearchKind(StrEnum):
+    BOOK = "book"
+    REVIEW = "review"
+
+
+class SearchHit(SQLModel):
+    """
+    Один результат поиска: книга или отзыв (для отзыва - с данными его книги).
+    """
+    kind: SearchKind
+    id: UUID
+    book_id: UUID
+    title: str
+    author: str
+    text: str | None = None
+    rank: float
+
+
+class SearchOut(SQLModel):
+    items: list[SearchHit]
+    next_cursor: str | None = None
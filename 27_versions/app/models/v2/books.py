@@ -1,16 +1,28 @@
 from sqlmodel import SQLModel
 
+from app.core.counting import CountKind
+
 # делаем повторный импорт моделей без изменений, чтобы в V2-версии API
 # обращаться только к V2-моделям
 from app.models.books import (
     BookCreate,
     BookUpdate,
-    BookOut,
+    BookOut as BookOutV1,
     BookDB,
     BookGenre,
+    BookSort,
 )
 
 
+class BookOut(BookOutV1):
+    """
+    Изменения в v2: средняя оценка и число отзывов из счетчиков книги,
+    чтобы не запрашивать отзывы каждой книги отдельно.
+    """
+    rating_avg: float | None = None
+    rating_count: int | None = None
+
+
 class PageMeta(SQLModel):
     """
     Метаданные параметров пагинации offset/limit.
@@ -18,8 +30,11 @@ class PageMeta(SQLModel):
     next_offset / prev_offset - подсказки клиенту:
     - next_offset: с какого offset загрузить следующую страницу (или None, если страницы нет)
     - prev_offset: с какого offset загрузить предыдущую страницу (или None, если страницы нет)
+
+    count_kind - какой count вернули: exact, estimated (оценка) или none (не считали).
     """
-    count: int
+    count: int | None
+    count_kind: CountKind = CountKind.EXACT
     limit: int
     offset: int
     next_offset: int | None = None
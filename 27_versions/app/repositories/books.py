@@ -1,9 +1,37 @@
 from uuid import UUID
-from sqlmodel import func, select
+from sqlalchemy import Select, delete
+from sqlmodel import select
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.books import BookCreate, BookDB, BookUpdate, BookGenre
+from app.core.filters import ilike_contains
+from app.core.returning import insert_returning, update_returning
+from app.core.counting import CountStrategy, PageCount, fetch_page_with_count
+from app.repositories.ratings import AGGREGATE_FIELDS, forget_book_ratings
+from app.models.books import BookCreate, BookDB, BookUpdate, BookGenre, BookSort
+
+# колонки BookOut: списки и выгрузка читают их без загрузки BookDB целиком
+BOOK_OUT_COLUMNS = (
+    BookDB.id,
+    BookDB.title,
+    BookDB.author,
+    BookDB.published_year,
+    BookDB.genre,
+    BookDB.description,
+    BookDB.page_count,
+)
+
+# счетчики оценок для v2, без чтения отзывов
+BOOK_RATING_COLUMNS = (BookDB.rating_avg, BookDB.rating_count)
+
+# ORDER BY для каждого BookSort совпадает с индексом (или с его обратным проходом),
+# id в конце - для стабильного порядка при равных значениях
+BOOK_SORTS = {
+    BookSort.TITLE: (BookDB.title, BookDB.id),
+    BookSort.RATING: (BookDB.rating_avg.asc().nulls_first(), BookDB.id),
+    BookSort.RATING_DESC: (BookDB.rating_avg.desc().nulls_last(), BookDB.id.desc()),
+    BookSort.REVIEWS: (BookDB.rating_count.desc(), BookDB.id.desc()),
+}
 
 
 def _apply_book_filters(
@@ -24,20 +52,16 @@ def _apply_book_filters(
     if q:
         q = q.strip()
         if q:
-            like = f"%{q}%"
+            # OR двух ILIKE план собирает через BitmapOr по двум trigram-индексам
             stmt = stmt.where(
-                (BookDB.title.ilike(like)) | (BookDB.author.ilike(like))
+                ilike_contains(BookDB.title, q) | ilike_contains(BookDB.author, q)
             )
 
     return stmt
 
 
 async def create_book(session: AsyncSession, data: BookCreate) -> BookDB:
-    book = BookDB(**data.model_dump())
-    session.add(book)
-    await session.commit()
-    await session.refresh(book)
-    return book
+    return await insert_returning(session, BookDB, data.model_dump())
 
 
 async def get_book(session: AsyncSession, book_id: UUID) -> BookDB | None:
@@ -53,33 +77,61 @@ async def list_books_with_count(
     year_to: int | None = None,
     limit: int = 50,
     offset: int = 0,
-) -> tuple[list[BookDB], int]:
-
-    data_stmt = select(BookDB)
-    data_stmt = _apply_book_filters(data_stmt, q, genre, year_from, year_to)
-    data_stmt = data_stmt.order_by(BookDB.title).offset(offset).limit(limit)
-
-    data_result = await session.exec(data_stmt)
-    books = data_result.all()
-
-    count_stmt = select(func.count()).select_from(BookDB)
-    count_stmt = _apply_book_filters(count_stmt, q, genre, year_from, year_to)
-
-    count_result = await session.exec(count_stmt)
-    count = count_result.one()
-
-    return books, count
+    count_strategy: CountStrategy | None = None,
+    columns: tuple | None = None,
+    sort: BookSort = BookSort.TITLE,
+) -> tuple[list[BookDB], PageCount]:
+    """Страница книг и count. С columns - только эти колонки (Row вместо BookDB)."""
+    return await fetch_page_with_count(
+        session=session,
+        model=BookDB,
+        apply_filters=lambda stmt: _apply_book_filters(stmt, q, genre, year_from, year_to),
+        order_by=BOOK_SORTS[sort],
+        limit=limit,
+        offset=offset,
+        strategy=count_strategy,
+        columns=columns,
+    )
+
+
+def book_out_columns(with_description: bool = True, with_ratings: bool = False) -> tuple:
+    """
+    Колонки BookOut для списков; description - самая тяжелая, ее можно не читать.
+    with_ratings добавляет счетчики оценок (BookOut v2).
+    """
+    columns = BOOK_OUT_COLUMNS
+    if not with_description:
+        columns = tuple(column for column in columns if column is not BookDB.description)
+    if with_ratings:
+        columns += BOOK_RATING_COLUMNS
+    return columns
+
+
+def export_books_stmt(
+    q: str | None = None,
+    genre: BookGenre | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
+) -> Select:
+    """Запрос для потоковой выгрузки: только колонки BookOut, без ORM-объектов и без ORDER BY."""
+    stmt = select(*BOOK_OUT_COLUMNS)
+    return _apply_book_filters(stmt, q, genre, year_from, year_to)
 
 
 async def update_book(session: AsyncSession, book_db: BookDB, data: BookUpdate) -> BookDB:
     patch = data.model_dump(exclude_unset=True)
-    book_db.sqlmodel_update(patch)
-    session.add(book_db)
-    await session.commit()
-    await session.refresh(book_db)
-    return book_db
+    return await update_returning(session, book_db, patch)
 
 
 async def delete_book(session: AsyncSession, book_db: BookDB) -> None:
-    await session.delete(book_db)
-    await session.commit()
\ No newline at end of file
+    # счетчики берем из самого DELETE: это последние значения перед удалением,
+    # отзывы книги удаляет ON DELETE CASCADE, их оценки уходят из общих счетчиков
+    stmt = (
+        delete(BookDB)
+        .where(BookDB.id == book_db.id)
+        .returning(*(getattr(BookDB, name) for name in AGGREGATE_FIELDS))
+        .execution_options(synchronize_session=False)
+    )
+    deleted = (await session.exec(stmt)).first()
+    if deleted is not None:
+        await forget_book_ratings(session, deleted._asdict())
\ No newline at end of file
@@ -0,0 +1,109 @@
+from uuid import UUID
+
+from sqlalchemy import or_, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.books import BookDB
+from app.models.ratings import GLOBAL_STATS_ID, RATING_VALUES, ReviewStatsDB
+from app.models.reviews import ReviewDB
+
+# все счетчики RatingAggregates
+AGGREGATE_FIELDS = ("rating_count", "rating_sum", *(f"rating_{value}" for value in RATING_VALUES))
+
+
+def _rating_deltas(removed: int | None, added: int | None) -> dict[str, int]:
+    """Изменение счетчиков, когда оценку removed убрали, а added добавили (любая может быть None)."""
+    deltas = dict.fromkeys(AGGREGATE_FIELDS, 0)
+    for rating, sign in ((removed, -1), (added, 1)):
+        if rating is not None:
+            deltas["rating_count"] += sign
+            deltas["rating_sum"] += sign * rating
+            deltas[f"rating_{rating}"] += sign
+    return {name: delta for name, delta in deltas.items() if delta}
+
+
+def _increments(model, deltas: dict[str, int]) -> dict:
+    # прибавляем в SQL, а не в Python: параллельные отзывы не затирают друг друга
+    return {name: getattr(model, name) + delta for name, delta in deltas.items()}
+
+
+async def _bump_global_stats(session: AsyncSession, deltas: dict[str, int]) -> None:
+    # строку создает миграция, upsert - на случай базы, созданной через create_all
+    stmt = insert(ReviewStatsDB).values(id=GLOBAL_STATS_ID, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReviewStatsDB.id],
+        set_=_increments(ReviewStatsDB, deltas),
+    )
+    await session.exec(stmt)
+
+
+async def apply_rating_change(
+    session: AsyncSession,
+    book_id: UUID,
+    removed: int | None = None,
+    added: int | None = None,
+) -> None:
+    """
+    Поправить счетчики книги и общие счетчики в текущей транзакции:
+    removed - оценка, которая ушла (удаление/изменение отзыва), added - которая появилась.
+    Коммитит вызывающий, вместе с самим изменением отзыва.
+    """
+    deltas = _rating_deltas(removed, added)
+    if not deltas:
+        return
+    await session.exec(
+        update(BookDB).where(BookDB.id == book_id).values(**_increments(BookDB, deltas))
+    )
+    await _bump_global_stats(session, deltas)
+
+
+async def forget_book_ratings(session: AsyncSession, aggregates: dict[str, int]) -> None:
+    """Вычесть из общих счетчиков оценки удаленной книги (ее отзывы удаляет ON DELETE CASCADE)."""
+    deltas = {name: -value for name, value in aggregates.items() if value}
+    if deltas:
+        await _bump_global_stats(session, deltas)
+
+
+async def reconcile_rating_stats(session: AsyncSession) -> int:
+    """
+    Пересчитать счетчики всех книг и общую строку по таблице reviews.
+    Вернуть число книг, у которых счетчики разошлись с отзывами.
+
+    На время пересчета запись отзывов блокируется (SHARE на reviews),
+    иначе изменения, сделанные параллельно, потерялись бы. Коммитит вызывающий.
+    """
+    await session.exec(text("LOCK TABLE reviews IN SHARE MODE"))
+
+    counters = (
+        func.count(ReviewDB.id).label("rating_count"),
+        func.coalesce(func.sum(ReviewDB.rating), 0).label("rating_sum"),
+        *(
+            func.count(ReviewDB.id).filter(ReviewDB.rating == value).label(f"rating_{value}")
+            for value in RATING_VALUES
+        ),
+    )
+
+    actual = (
+        select(BookDB.id.label("book_id"), *counters)
+        .select_from(BookDB)
+        .outerjoin(ReviewDB, ReviewDB.book_id == BookDB.id)
+        .group_by(BookDB.id)
+        .subquery()
+    )
+    drifted = or_(*(getattr(BookDB, name) != actual.c[name] for name in AGGREGATE_FIELDS))
+    stmt = (
+        update(BookDB)
+        .where(BookDB.id == actual.c.book_id, drifted)
+        .values(**{name: actual.c[name] for name in AGGREGATE_FIELDS})
+        .returning(BookDB.id)
+        .execution_options(synchronize_session=False)
+    )
+    fixed = len((await session.exec(stmt)).all())
+
+    totals = (await session.exec(select(*counters))).one()._asdict()
+    upsert = insert(ReviewStatsDB).values(id=GLOBAL_STATS_ID, **totals)
+    upsert = upsert.on_conflict_do_update(index_elements=[ReviewStatsDB.id], set_=totals)
+    await session.exec(upsert)
+    return fixed
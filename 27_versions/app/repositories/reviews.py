@@ -1,10 +1,15 @@
 from uuid import UUID
 
-from sqlmodel import func, select
+from sqlalchemy import delete
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.returning import insert_returning, update_returning
+from app.core.counting import CountStrategy, PageCount, fetch_page_with_count
 from app.models.reviews import ReviewCreate, ReviewDB, ReviewUpdate
 from app.models.books import BookDB
+from app.models.ratings import GLOBAL_STATS_ID, ReviewStatsDB
+from app.repositories.ratings import apply_rating_change
 
 
 def _apply_review_filters(stmt, book_id: UUID | None = None):
@@ -14,10 +19,8 @@ def _apply_review_filters(stmt, book_id: UUID | None = None):
 
 
 async def create_review(session: AsyncSession, book: BookDB, data: ReviewCreate) -> ReviewDB:
-    review = ReviewDB(book=book, **data.model_dump())
-    session.add(review)
-    await session.commit()
-    await session.refresh(review)
+    review = await insert_returning(session, ReviewDB, {**data.model_dump(), "book_id": book.id})
+    await apply_rating_change(session, book.id, added=review.rating)
     return review
 
 
@@ -31,53 +34,65 @@ async def list_reviews_with_count(
     book_id: UUID | None = None,
     limit: int = 50,
     offset: int = 0,
-) -> tuple[list[ReviewDB], int]:
-    data_stmt = select(ReviewDB)
-    data_stmt = _apply_review_filters(data_stmt, book_id=book_id)
-    data_stmt = data_stmt.order_by(ReviewDB.id).offset(offset).limit(limit)
-
-    data_result = await session.exec(data_stmt)
-    reviews = data_result.all()
-
-    count_stmt = select(func.count()).select_from(ReviewDB)
-    count_stmt = _apply_review_filters(count_stmt, book_id=book_id)
+    count_strategy: CountStrategy | None = None,
+) -> tuple[list[ReviewDB], PageCount]:
+    return await fetch_page_with_count(
+        session=session,
+        model=ReviewDB,
+        apply_filters=lambda stmt: _apply_review_filters(stmt, book_id=book_id),
+        order_by=(ReviewDB.id,),
+        limit=limit,
+        offset=offset,
+        strategy=count_strategy,
+    )
 
-    count_result = await session.exec(count_stmt)
-    count = count_result.one()
 
-    return reviews, count
+def _count_and_avg(rating_count: int, rating_sum: int) -> tuple[int, float | None]:
+    return rating_count, rating_sum / rating_count if rating_count else None
 
 
 async def get_review_stats_for_book(session: AsyncSession, book_id: UUID) -> tuple[int, float | None]:
-    """Возвращает (count, avg_rating) для конкретной книги."""
-    stmt = (
-        select(func.count(ReviewDB.id), func.avg(ReviewDB.rating))
-        .where(ReviewDB.book_id == book_id)
-    )
-    result = await session.exec(stmt)
-    count, avg = result.one()
-    # avg может быть Decimal/None, приводим к float
-    avg_float = float(avg) if avg is not None else None
-    return int(count), avg_float
+    """Возвращает (count, avg_rating) для конкретной книги: чтение счетчиков книги по первичному ключу."""
+    stmt = select(BookDB.rating_count, BookDB.rating_sum).where(BookDB.id == book_id)
+    row = (await session.exec(stmt)).first()
+    if row is None:
+        return 0, None
+    return _count_and_avg(*row)
 
 
 async def get_global_review_stats(session: AsyncSession) -> tuple[int, float | None]:
-    """(total_reviews, overall_avg_rating) по всем отзывам."""
-    stmt = select(func.count(ReviewDB.id), func.avg(ReviewDB.rating))
-    result = await session.exec(stmt)
-    count, avg = result.one()
-    return int(count), float(avg) if avg is not None else None
+    """(total_reviews, overall_avg_rating) по всем отзывам, из строки review_stats."""
+    stmt = select(ReviewStatsDB.rating_count, ReviewStatsDB.rating_sum).where(
+        ReviewStatsDB.id == GLOBAL_STATS_ID
+    )
+    row = (await session.exec(stmt)).first()
+    if row is None:
+        return 0, None
+    return _count_and_avg(*row)
 
 
 async def patch_review(session: AsyncSession, review_db: ReviewDB, data: ReviewUpdate) -> ReviewDB:
     patch = data.model_dump(exclude_unset=True)
-    review_db.sqlmodel_update(patch)
-    session.add(review_db)
-    await session.commit()
-    await session.refresh(review_db)
+    old_rating = None
+    if "rating" in patch:
+        # прежнюю оценку берем под блокировкой строки: параллельный patch
+        # того же отзыва иначе посчитал бы разницу от устаревшего значения
+        stmt = select(ReviewDB.rating).where(ReviewDB.id == review_db.id).with_for_update()
+        old_rating = (await session.exec(stmt)).one()
+    review_db = await update_returning(session, review_db, patch)
+    if old_rating is not None and old_rating != review_db.rating:
+        await apply_rating_change(session, review_db.book_id, removed=old_rating, added=review_db.rating)
     return review_db
 
 
 async def delete_review(session: AsyncSession, review_db: ReviewDB) -> None:
-    await session.delete(review_db)
-    await session.commit()
+    # оценку удаленной строки отдает сам DELETE, а не объект из сессии
+    stmt = (
+        delete(ReviewDB)
+        .where(ReviewDB.id == review_db.id)
+        .returning(ReviewDB.book_id, ReviewDB.rating)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = (await session.exec(stmt)).first()
+    if deleted is not None:
+        await apply_rating_change(session, deleted.book_id, removed=deleted.rating)
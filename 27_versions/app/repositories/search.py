@@ -0,0 +1,85 @@
+from uuid import UUID
+
+from sqlalchemy import Float, and_, cast, literal, or_, tuple_, union_all
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.books import BookDB
+from app.models.reviews import ReviewDB
+from app.models.search import SEARCH_CONFIG, SearchHit, SearchKind
+
+books_table = BookDB.__table__
+reviews_table = ReviewDB.__table__
+
+
+def _ts_query(q: str):
+    # websearch_to_tsquery понимает "фразы", OR и -исключения и не падает на любом вводе
+    return func.websearch_to_tsquery(literal(SEARCH_CONFIG, type_=REGCONFIG), q)
+
+
+async def search_books_and_reviews(
+    session: AsyncSession,
+    q: str,
+    kind: SearchKind | None = None,
+    limit: int = 20,
+    after: tuple[float, SearchKind, UUID] | None = None,
+) -> tuple[list[SearchHit], tuple[float, SearchKind, UUID] | None]:
+    """
+    Книги и отзывы, подходящие под запрос, по убыванию ts_rank.
+    Каждая ветка UNION выбирает строки через GIN-индекс по search_vector.
+    Вернуть результаты и ключ (rank, kind, id) для следующей страницы.
+    """
+    ts_query = _ts_query(q)
+    branches = []
+
+    if kind in (None, SearchKind.BOOK):
+        branches.append(
+            select(
+                literal(SearchKind.BOOK.value).label("kind"),
+                books_table.c.id.label("id"),
+                books_table.c.id.label("book_id"),
+                books_table.c.title.label("title"),
+                books_table.c.author.label("author"),
+                literal(None).label("text"),
+                cast(func.ts_rank(books_table.c.search_vector, ts_query), Float).label("rank"),
+            ).where(books_table.c.search_vector.op("@@")(ts_query))
+        )
+
+    if kind in (None, SearchKind.REVIEW):
+        branches.append(
+            select(
+                literal(SearchKind.REVIEW.value).label("kind"),
+                reviews_table.c.id.label("id"),
+                reviews_table.c.book_id.label("book_id"),
+                books_table.c.title.label("title"),
+                books_table.c.author.label("author"),
+                reviews_table.c.text.label("text"),
+                cast(func.ts_rank(reviews_table.c.search_vector, ts_query), Float).label("rank"),
+            )
+            .join(books_table, books_table.c.id == reviews_table.c.book_id)
+            .where(reviews_table.c.search_vector.op("@@")(ts_query))
+        )
+
+    hits = union_all(*branches).subquery("hits")
+    stmt = select(*hits.c)
+
+    if after is not None:
+        rank, after_kind, after_id = after
+        # rank по убыванию, при равном rank - (kind, id) по возрастанию
+        stmt = stmt.where(
+            or_(
+                hits.c.rank < rank,
+                and_(hits.c.rank == rank, tuple_(hits.c.kind, hits.c.id) > tuple_(after_kind.value, after_id)),
+            )
+        )
+    # берем на одну строку больше, чтобы узнать, есть ли следующая страница
+    stmt = stmt.order_by(hits.c.rank.desc(), hits.c.kind, hits.c.id).limit(limit + 1)
+
+    rows = (await session.exec(stmt)).mappings().all()
+    items = [SearchHit.model_validate(dict(row)) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return items, None
+
+    last = items[-1]
+    return items, (last.rank, last.kind, last.id)
@@ -1,16 +1,21 @@
+from typing import Any
 from uuid import UUID
 
+from sqlalchemy import Select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.counting import CountStrategy, PageCount
 from app.domain.book import Book, BookGenre
 from app.domain.book import DomainError
-from app.models.books import BookCreate, BookUpdate, BookDB
+from app.models.books import BookCreate, BookUpdate, BookDB, BookSort
 from app.repositories.books import (
     create_book,
     get_book,
     update_book,
     delete_book,
-    list_books_with_count
+    list_books_with_count,
+    book_out_columns,
+    export_books_stmt,
 )
 
 class ServiceError(Exception):
@@ -52,7 +57,12 @@ class BookService:
         year_to: int | None = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> tuple[list[BookDB], int]:
+        count_strategy: CountStrategy | None = None,
+        with_description: bool = True,
+        with_ratings: bool = False,
+        sort: BookSort = BookSort.TITLE,
+    ) -> tuple[list[Any], PageCount]:
+        """Страница книг для списка: только колонки BookOut (Row), без ORM-объектов."""
         return await list_books_with_count(
             session=session,
             q=q,
@@ -61,9 +71,22 @@ class BookService:
             year_to=year_to,
             limit=limit,
             offset=offset,
+            count_strategy=count_strategy,
+            columns=book_out_columns(with_description, with_ratings),
+            sort=sort,
         )
 
 
+    def export_stmt(
+        self,
+        q: str | None = None,
+        genre: BookGenre | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+    ) -> Select:
+        return export_books_stmt(q=q, genre=genre, year_from=year_from, year_to=year_to)
+
+
     async def update(self, session: AsyncSession, book_id: UUID, data: BookUpdate) -> BookDB | None:
         book_db = await get_book(session, book_id)
         if book_db is None:
@@ -2,6 +2,7 @@ from uuid import UUID
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.counting import CountStrategy, PageCount
 from app.domain.reviews import Review, DomainError
 from app.models.reviews import ReviewCreate, ReviewDB, ReviewUpdate
 from app.repositories.reviews import (
@@ -38,9 +39,16 @@ class ReviewService:
         return await get_review(session, review_id)
 
     async def list_with_count(
-        self, session: AsyncSession, book_id: UUID | None = None, limit: int = 50, offset: int = 0
-    ) -> tuple[list[ReviewDB], int]:
-        return await list_reviews_with_count(session=session, book_id=book_id, limit=limit, offset=offset)
+        self,
+        session: AsyncSession,
+        book_id: UUID | None = None,
+        limit: int = 50,
+        offset: int = 0,
+        count_strategy: CountStrategy | None = None,
+    ) -> tuple[list[ReviewDB], PageCount]:
+        return await list_reviews_with_count(
+            session=session, book_id=book_id, limit=limit, offset=offset, count_strategy=count_strategy
+        )
 
     async def update(self, session: AsyncSession, review_id: UUID, payload: ReviewUpdate) -> ReviewDB | None:
         review_db = await get_review(session, review_id)
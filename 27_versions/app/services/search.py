@@ -0,0 +1,43 @@
+from uuid import UUID
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.search import SearchHit, SearchKind
+from app.repositories.search import search_books_and_reviews
+from app.services.books import ValidationServiceError
+
+
+class SearchService:
+    async def search(
+        self,
+        session: AsyncSession,
+        q: str,
+        kind: SearchKind | None = None,
+        limit: int = 20,
+        after: str | None = None,
+    ) -> tuple[list[SearchHit], str | None]:
+        """
+        Полнотекстовый поиск по книгам и отзывам, after - курсор из прошлого ответа.
+        """
+        q = q.strip()
+        if not q:
+            raise ValidationServiceError("Поисковый запрос не должен быть пустым.")
+
+        key = None
+        if after is not None:
+            try:
+                rank, raw_kind, raw_id = decode_cursor(after, size=3)
+                key = (float(rank), SearchKind(raw_kind), UUID(raw_id))
+            except ValueError as e:
+                raise ValidationServiceError("Некорректный курсор.") from e
+
+        items, next_key = await search_books_and_reviews(
+            session=session, q=q, kind=kind, limit=limit, after=key
+        )
+        # repr(float) восстанавливается без потерь, поэтому сравнение rank на границе точное
+        next_cursor = encode_cursor(repr(next_key[0]), *next_key[1:]) if next_key is not None else None
+        return items, next_cursor
+
+
+search_service = SearchService()